@@ -0,0 +1,79 @@
+import argparse
+import time
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from db_pool import create_pool
+from workout_data_api import COPY_WORKOUT_DATA_SQL
+
+# benchmark: rows/sec for the old one-insert-per-request path vs the batch paths
+# runs against a temp copy of workout_data so the real table is never touched
+# usage: python bench_workout_ingest.py --rows 5000
+
+
+def make_rows(n: int) -> list:
+    exercises = ["squat", "bench", "deadlift", "row", "press", "curl"]
+    now = datetime.now(timezone.utc)
+    return [(exercises[i % len(exercises)], 3 + i % 3, 5 + i % 8, now) for i in range(n)]
+
+
+def bench_single_row(conn, rows: list) -> float:
+    # what POST /workout_data does: one INSERT and one commit per row
+    start = time.perf_counter()
+    with conn.cursor() as cursor:
+        for row in rows:
+            cursor.execute("INSERT INTO workout_data (exercise_name, sets, reps, date) VALUES (%s, %s, %s, %s)", row)
+            conn.commit()
+    return time.perf_counter() - start
+
+
+def bench_executemany(conn, rows: list) -> float:
+    # executemany is pipelined by psycopg, single commit
+    start = time.perf_counter()
+    with conn.cursor() as cursor:
+        cursor.executemany("INSERT INTO workout_data (exercise_name, sets, reps, date) VALUES (%s, %s, %s, %s)", rows)
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def bench_copy(conn, rows: list) -> float:
+    # what POST /workout_data/batch does: one COPY, single commit
+    start = time.perf_counter()
+    with conn.cursor() as cursor:
+        with cursor.copy(COPY_WORKOUT_DATA_SQL) as copy:
+            for row in rows:
+                copy.write_row(row)
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="workout_data ingest benchmark")
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    pool = create_pool()
+    pool.open(wait=True)
+
+    try:
+        with pool.connection() as conn:
+            # temp table shadows workout_data for this session only
+            conn.execute("CREATE TEMP TABLE workout_data (LIKE public.workout_data INCLUDING DEFAULTS INCLUDING IDENTITY)")
+            conn.commit()
+
+            print(f"inserting {len(rows)} rows per method")
+            print("-" * 50)
+            for name, bench in [("single row + commit", bench_single_row),
+                                ("executemany", bench_executemany),
+                                ("copy", bench_copy)]:
+                elapsed = bench(conn, rows)
+                print(f"{name:<22} {elapsed:8.3f}s {len(rows) / elapsed:12.0f} rows/sec")
+                conn.execute("TRUNCATE workout_data")
+                conn.commit()
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    main()
@@ -0,0 +1,84 @@
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import HTTPException
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
+
+# shared postgres connection pools for the api
+# settings are read when the pool is created (after load_dotenv) so they can be changed with env vars:
+#   DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE - connections kept open / hard upper limit
+#   DB_POOL_TIMEOUT - seconds a request waits for a free connection before giving up
+#   DB_POOL_MAX_IDLE - seconds an unused connection above min_size is kept around
+#   DB_POOL_MAX_LIFETIME - seconds before a connection is recycled
+#   DB_CONNECT_TIMEOUT - seconds to wait for postgres when opening a new connection
+
+# the pool used by the api handlers, opened and closed by the app lifespan
+db_pool: Optional[AsyncConnectionPool] = None
+
+
+def pool_settings() -> dict:
+    return {
+        "conninfo": os.getenv("DATABASE_URL", ""),
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+        "kwargs": {"connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5"))},
+    }
+
+
+def create_async_pool() -> AsyncConnectionPool:
+    # check_connection runs a quick ping before handing out a connection so dropped ones get replaced
+    return AsyncConnectionPool(check=AsyncConnectionPool.check_connection, open=False, **pool_settings())
+
+
+def create_pool() -> ConnectionPool:
+    # blocking version of the same pool for scripts and benchmarks
+    return ConnectionPool(check=ConnectionPool.check_connection, open=False, **pool_settings())
+
+
+async def open_db_pool() -> AsyncConnectionPool:
+    global db_pool
+
+    if db_pool is None:
+        db_pool = create_async_pool()
+        # don't wait for min_size connections so the api still starts if postgres is slow to come up
+        await db_pool.open()
+    return db_pool
+
+
+async def close_db_pool() -> None:
+    global db_pool
+
+    if db_pool is not None:
+        await db_pool.close()
+        db_pool = None
+
+
+@asynccontextmanager
+async def get_db_connection():
+    """
+    Borrow a connection from the shared pool
+    The transaction is committed when the block exits and rolled back if it raises
+    """
+    if db_pool is None:
+        raise HTTPException(status_code=500, detail="Database connection error: pool is not open")
+
+    try:
+        async with db_pool.connection() as conn:
+            yield conn
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=f"Database connection error: {str(e)}")
+
+
+def get_pool_stats() -> dict:
+    if db_pool is None:
+        return {"open": False}
+    stats = db_pool.get_stats()
+    return {
+        "open": True,
+        "size": stats.get("pool_size", 0),
+        "available": stats.get("pool_available", 0),
+        "waiting": stats.get("requests_waiting", 0),
+    }
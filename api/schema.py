@@ -0,0 +1,192 @@
+import asyncio
+import datetime
+import os
+from typing import List, Tuple
+import psycopg
+from psycopg import sql
+from dotenv import load_dotenv
+
+# versioned schema for the workout_data table, owned by the api
+# migrations are applied in order on startup (or with `python schema.py`) and recorded in schema_migrations
+# add new changes as a new version at the end, never edit one that has already shipped
+
+# any constant works, it just keeps two api workers from migrating (or adding partitions) at the same time
+MIGRATION_LOCK_ID = 74201
+
+CREATE_MIGRATIONS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+TABLE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS workout_data (
+        id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+        exercise_name TEXT NOT NULL,
+        sets INT NOT NULL,
+        reps INT NOT NULL,
+        date TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    """,
+]
+
+# range partitioned by month on date, the primary key has to include the partition column
+# rows outside the created monthly partitions land in workout_data_default
+# an existing workout_data that isn't partitioned is left as it is, CREATE TABLE IF NOT EXISTS skips it and there
+# is nothing to hang the default partition on
+PARTITIONED_TABLE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS workout_data (
+        id BIGINT GENERATED ALWAYS AS IDENTITY,
+        exercise_name TEXT NOT NULL,
+        sets INT NOT NULL,
+        reps INT NOT NULL,
+        date TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (id, date)
+    ) PARTITION BY RANGE (date)
+    """,
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'workout_data'::regclass) THEN
+            CREATE TABLE IF NOT EXISTS workout_data_default PARTITION OF workout_data DEFAULT;
+        ELSE
+            RAISE NOTICE 'workout_data already exists and is not partitioned, WORKOUT_DATA_PARTITIONED is ignored';
+        END IF;
+    END $$
+    """,
+]
+
+
+def migrations(partitioned: bool = False) -> List[Tuple[int, str, List[str]]]:
+    """(version, name, statements) for every schema version"""
+    return [
+        (1, "create workout_data", PARTITIONED_TABLE_SQL if partitioned else TABLE_SQL),
+        # tables created by hand before the api owned the schema only have exercise_name, sets, reps
+        (2, "add id and date to existing workout_data", [
+            """
+            ALTER TABLE workout_data
+                ADD COLUMN IF NOT EXISTS id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+                ADD COLUMN IF NOT EXISTS date TIMESTAMPTZ NOT NULL DEFAULT now()
+            """,
+        ]),
+        # the leading exercise_name column also serves plain exercise_name lookups and deletes,
+        # so a separate single-column index would only slow down inserts
+        (3, "index workout_data on exercise_name, date", [
+            "CREATE INDEX IF NOT EXISTS workout_data_exercise_name_date_idx ON workout_data (exercise_name, date)",
+        ]),
+    ]
+
+
+def partitioning_enabled() -> bool:
+    # only matters the first time the table is created
+    return os.getenv("WORKOUT_DATA_PARTITIONED", "0").lower() in ("1", "true", "yes")
+
+
+async def run_migrations(conn: psycopg.AsyncConnection, partitioned: bool = False) -> List[int]:
+    """Apply any migrations that haven't run yet, returns the versions applied"""
+    applied_now = []
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        await conn.execute(CREATE_MIGRATIONS_TABLE_SQL)
+
+        cursor = await conn.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in await cursor.fetchall()}
+
+        for version, name, statements in migrations(partitioned):
+            if version in applied:
+                continue
+            for statement in statements:
+                await conn.execute(statement)
+            await conn.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name)
+            )
+            applied_now.append(version)
+            print(f"applied migration {version}: {name}")
+
+    return applied_now
+
+
+def add_months(day: datetime.date, months: int) -> datetime.date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return datetime.date(month_index // 12, month_index % 12 + 1, 1)
+
+
+async def fetch_value(conn: psycopg.AsyncConnection, query: str, params: tuple = ()):
+    cursor = await conn.execute(query, params)
+    return (await cursor.fetchone())[0]
+
+
+async def create_month_partition(conn: psycopg.AsyncConnection, name: str, start: datetime.date,
+                                 end: datetime.date, has_default: bool) -> None:
+    """Create one monthly partition, moving any of its rows that already landed in the default partition"""
+    create = sql.SQL("CREATE TABLE {} PARTITION OF workout_data FOR VALUES FROM ({}) TO ({})").format(
+        sql.Identifier(name), sql.Literal(start), sql.Literal(end)
+    )
+    stranded = has_default and await fetch_value(
+        conn, "SELECT EXISTS (SELECT 1 FROM workout_data_default WHERE date >= %s AND date < %s)", (start, end)
+    )
+    if not stranded:
+        await conn.execute(create)
+        return
+
+    # postgres won't create a partition for rows the default partition already holds, so take the default out,
+    # create the partition, route the rows through the parent into it and put the default back
+    await conn.execute("ALTER TABLE workout_data DETACH PARTITION workout_data_default")
+    await conn.execute(create)
+    cursor = await conn.execute(
+        """
+        INSERT INTO workout_data (id, exercise_name, sets, reps, date) OVERRIDING SYSTEM VALUE
+        SELECT id, exercise_name, sets, reps, date FROM workout_data_default WHERE date >= %s AND date < %s
+        """,
+        (start, end)
+    )
+    await conn.execute("DELETE FROM workout_data_default WHERE date >= %s AND date < %s", (start, end))
+    await conn.execute("ALTER TABLE workout_data ATTACH PARTITION workout_data_default DEFAULT")
+    print(f"moved {cursor.rowcount} rows from workout_data_default to {name}")
+
+
+async def ensure_month_partitions(conn: psycopg.AsyncConnection, months_ahead: int = 3) -> List[str]:
+    """
+    Create monthly partitions from the current month up to months_ahead months out, returns the ones created
+    The api runs this at startup and then every PARTITION_CHECK_HOURS, so a month's partition exists well before
+    its first row
+    """
+    created = []
+    async with conn.transaction():
+        # no-op unless workout_data was created partitioned
+        if not await fetch_value(
+            conn, "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('workout_data'))"
+        ):
+            return created
+
+        await conn.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        has_default = await fetch_value(conn, "SELECT to_regclass('workout_data_default') IS NOT NULL")
+        month_start = datetime.date.today().replace(day=1)
+        for i in range(months_ahead + 1):
+            start = add_months(month_start, i)
+            name = f"workout_data_y{start:%Y}m{start:%m}"
+            if await fetch_value(conn, "SELECT to_regclass(%s) IS NOT NULL", (name,)):
+                continue
+            await create_month_partition(conn, name, start, add_months(month_start, i + 1), has_default)
+            created.append(name)
+            print(f"created partition {name}")
+
+    return created
+
+
+async def main() -> None:
+    async with await psycopg.AsyncConnection.connect(os.getenv("DATABASE_URL", "")) as conn:
+        applied = await run_migrations(conn, partitioning_enabled())
+        await ensure_month_partitions(conn)
+        await conn.commit()
+    print(f"schema up to date ({len(applied)} migrations applied)")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
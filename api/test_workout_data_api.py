@@ -0,0 +1,184 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+import workout_data_api
+from workout_data_api import app, iter_ndjson_lines
+
+# TestClient is used without a with block, so the lifespan (pool + migrations) never runs,
+# the endpoints get a FakeConnection instead through get_db_connection
+client = TestClient(app)
+
+
+class FakeCopy:
+    def __init__(self, rows: list):
+        self.rows = rows
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def write_row(self, row):
+        self.rows.append(row)
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.pending = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def copy(self, statement):
+        return FakeCopy(self.connection.copied)
+
+    async def execute(self, query, params):
+        # the read queries are all "WHERE id > %s ORDER BY id [LIMIT %s]"
+        after, *limit = params
+        self.pending = [row for row in self.connection.rows if row[0] > after]
+        if limit:
+            self.pending = self.pending[:limit[0]]
+
+    async def fetchmany(self, size):
+        rows, self.pending = self.pending[:size], self.pending[size:]
+        return rows
+
+    async def fetchall(self):
+        rows, self.pending = self.pending, []
+        return rows
+
+
+class FakeConnection:
+    def __init__(self, rows=()):
+        self.copied = []
+        self.rows = list(rows)  # (id, exercise_name, sets, reps, date)
+
+    def cursor(self, name=None):
+        return FakeCursor(self)
+
+
+def use_fake_connection(monkeypatch, rows=()) -> FakeConnection:
+    connection = FakeConnection(rows)
+
+    @asynccontextmanager
+    async def get_db_connection():
+        yield connection
+
+    monkeypatch.setattr(workout_data_api, "get_db_connection", get_db_connection)
+    return connection
+
+
+class ChunkedRequest:
+    """Just the part of a starlette Request that iter_ndjson_lines reads"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def ndjson_lines(chunks) -> list:
+    async def collect():
+        return [item async for item in iter_ndjson_lines(ChunkedRequest(chunks))]
+    return asyncio.run(collect())
+
+
+def test_ndjson_lines_across_chunk_boundaries():
+    chunks = [b'{"a"', b': 1}\n\n{"b"', b': 2}\n', b'   \n{"c": 3}']
+
+    # blank lines are skipped but still counted, the last line needs no newline
+    assert ndjson_lines(chunks) == [(1, b'{"a": 1}'), (3, b'{"b": 2}'), (5, b'{"c": 3}')]
+    assert ndjson_lines([b'{"a": 1}\n']) == [(1, b'{"a": 1}')]
+    assert ndjson_lines([]) == []
+
+
+def test_ndjson_upload_copies_every_row(monkeypatch):
+    connection = use_fake_connection(monkeypatch)
+    body = b'{"exercise_name": "squat", "sets": 5, "reps": 5}\n\n{"exercise_name": "row", "sets": 3, "reps": 8}\n'
+
+    response = client.post("/workout_data/batch/ndjson", content=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 2, "batch_counts": [2]}
+    assert [row[:3] for row in connection.copied] == [("squat", 5, 5), ("row", 3, 8)]
+
+
+def test_ndjson_upload_reports_bad_line_number(monkeypatch):
+    use_fake_connection(monkeypatch)
+    body = b'{"exercise_name": "squat", "sets": 5, "reps": 5}\n\n{"exercise_name": "row", "sets": "three"}\n'
+
+    response = client.post("/workout_data/batch/ndjson", content=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith("Invalid workout on line 3:")
+
+
+def test_batch_insert_fills_in_missing_dates(monkeypatch):
+    connection = use_fake_connection(monkeypatch)
+
+    response = client.post("/workout_data/batch", json={"workouts": [
+        {"exercise_name": "squat", "sets": 5, "reps": 5},
+        {"exercise_name": "row", "sets": 3, "reps": 8, "date": "2025-01-01T12:00:00Z"},
+    ]})
+
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 2, "batch_counts": [2]}
+    first, second = connection.copied
+    assert first[3] is not None and second[3].isoformat() == "2025-01-01T12:00:00+00:00"
+
+
+def stored_rows(count: int) -> list:
+    day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [(i, f"exercise {i}", 3, 10, day) for i in range(1, count + 1)]
+
+
+def test_pages_send_next_cursor_only_when_full(monkeypatch):
+    use_fake_connection(monkeypatch, stored_rows(5))
+
+    response = client.get("/workout_data", params={"limit": 2})
+    assert [row["id"] for row in response.json()] == [1, 2]
+    assert response.headers["X-Next-After"] == "2"
+
+    response = client.get("/workout_data", params={"after": 4, "limit": 2})
+    assert [row["id"] for row in response.json()] == [5]
+    assert "X-Next-After" not in response.headers
+
+
+def test_stream_json_array_across_chunks(monkeypatch):
+    use_fake_connection(monkeypatch, stored_rows(5))
+    monkeypatch.setattr(workout_data_api, "STREAM_CHUNK_SIZE", 2)
+
+    response = client.get("/workout_data", params={"stream": "json", "after": 1})
+
+    assert response.headers["content-type"] == "application/json"
+    assert [row["id"] for row in json.loads(response.text)] == [2, 3, 4, 5]
+    assert response.json()[0] == {"id": 2, "exercise_name": "exercise 2", "sets": 3, "reps": 10,
+                                  "date": "2025-01-01T00:00:00+00:00"}
+
+
+def test_stream_empty_result(monkeypatch):
+    use_fake_connection(monkeypatch, stored_rows(2))
+
+    assert client.get("/workout_data", params={"stream": "json", "after": 2}).text == "[]"
+    assert client.get("/workout_data", params={"stream": "ndjson", "after": 2}).text == ""
+
+
+def test_stream_ndjson(monkeypatch):
+    use_fake_connection(monkeypatch, stored_rows(3))
+    monkeypatch.setattr(workout_data_api, "STREAM_CHUNK_SIZE", 2)
+
+    response = client.get("/workout_data", params={"stream": "ndjson"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [1, 2, 3]
@@ -1,13 +1,19 @@
+import asyncio
+import json
 import os
-import psycopg
-from fastapi import FastAPI, HTTPException
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import datetime, timezone
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional
 from fastapi.testclient import TestClient
 from dotenv import load_dotenv
-# from datetime import date
+from db_pool import open_db_pool, close_db_pool, get_db_connection, get_pool_stats
+from schema import run_migrations, ensure_month_partitions, partitioning_enabled
 
 # API to set workout data in postgres
 
@@ -16,15 +22,80 @@ class Workout_Data(BaseModel):
     exercise_name: str
     sets: int
     reps: int
-    # date: date = Field(default_factory=date.today())
+    date: Optional[datetime] = None  # defaults to the time the row is stored
+
+
+# a stored workout, id is the cursor used for pagination (?after=<id>)
+class Workout_Data_Record(Workout_Data):
+    id: int
 
 
 class Workout_Data_Row(BaseModel):
     workouts: List[Workout_Data]
 
 
+# result of a bulk insert, batch_counts has the rows written per batch
+class Workout_Batch_Result(BaseModel):
+    inserted: int
+    batch_counts: List[int]
+
+
+# rows are streamed into postgres with COPY instead of one INSERT per row
+COPY_WORKOUT_DATA_SQL = "COPY workout_data (exercise_name, sets, reps, date) FROM STDIN"
+
+# NDJSON uploads are counted in batches of this many rows
+NDJSON_BATCH_SIZE = 1000
+
+# page size limits for GET /workout_data, the id of the last row of a full page is sent back in X-Next-After
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# rows fetched per round trip from the server-side cursor when streaming
+STREAM_CHUNK_SIZE = 500
+
+
+def copy_row(workout: Workout_Data, now: datetime) -> tuple:
+    # COPY skips column defaults, so fill in the date here
+    return workout.exercise_name, workout.sets, workout.reps, workout.date or now
+
+
+async def maintain_month_partitions(interval: float) -> None:
+    """Keep adding the upcoming monthly partitions while the api runs, so new rows don't pile up in the default"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with get_db_connection() as conn:
+                await ensure_month_partitions(conn)
+        except Exception as e:
+            print(f"partition maintenance failed, retrying in {interval:.0f}s: {e}")
+
+
+# open the shared connection pool on startup and close it on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_db_pool()
+    partition_task = None
+    # bring the workout_data schema up to date, set RUN_MIGRATIONS=0 to manage it by hand with schema.py
+    if os.getenv("RUN_MIGRATIONS", "1") != "0":
+        async with get_db_connection() as conn:
+            await run_migrations(conn, partitioning_enabled())
+            await ensure_month_partitions(conn)
+        # PARTITION_CHECK_HOURS (default 12) between checks for next month's partitions
+        partition_task = asyncio.create_task(
+            maintain_month_partitions(float(os.getenv("PARTITION_CHECK_HOURS", "12")) * 3600)
+        )
+    yield
+    if partition_task is not None:
+        partition_task.cancel()
+        try:
+            await partition_task
+        except asyncio.CancelledError:
+            pass
+    await close_db_pool()
+
+
 # create an instance of the api
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # CORS origins - be more specific in production
 origins = [
@@ -41,6 +112,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-After"],  # let the frontend read the pagination cursor
 )
 
 # Debug middleware - place AFTER CORS
@@ -54,92 +126,219 @@ async def log_origin(request, call_next):
     return response
 
 
-# Database connection helper
-def get_db_connection():
+# POST endpoint to create new workout data
+@app.post("/workout_data", response_model=Workout_Data)
+async def create_workout_data(workout_data: Workout_Data):
     try:
-        conn = psycopg.connect(os.getenv("DATABASE_URL"))
-        return conn
+        # connections come from the shared pool, the insert is committed when the block exits
+        async with get_db_connection() as conn:
+            async with conn.cursor() as cursor:
+                # Fixed: Remove extra %s placeholder - only 3 values being inserted
+                await cursor.execute(
+                    """
+                    INSERT INTO workout_data (exercise_name, sets, reps, date)
+                    VALUES (%s, %s, %s, COALESCE(%s, now()))
+                    RETURNING date;
+                    """,
+                    (workout_data.exercise_name, workout_data.sets, workout_data.reps, workout_data.date)
+                )
+                workout_data.date = (await cursor.fetchone())[0]
+
+        return workout_data
+
+    except HTTPException:
+        raise  # Re-raise HTTP exceptions
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database connection error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error inserting data: {str(e)}")
 
 
-# POST endpoint to create new workout data
-@app.post("/workout_data", response_model=Workout_Data)
-def create_workout_data(workout_data: Workout_Data):
-    conn = None
+# POST endpoint to insert a whole session / backfill in one transaction
+@app.post("/workout_data/batch", response_model=Workout_Batch_Result)
+async def create_workout_data_batch(workout_rows: Workout_Data_Row):
+    if not workout_rows.workouts:
+        return Workout_Batch_Result(inserted=0, batch_counts=[])
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Fixed: Remove extra %s placeholder - only 3 values being inserted
-        cursor.execute(
-            """
-            INSERT INTO workout_data (exercise_name, sets, reps)
-            VALUES (%s, %s, %s);
-            """,
-            (workout_data.exercise_name, workout_data.sets, workout_data.reps)
-        )
+        async with get_db_connection() as conn:
+            async with conn.cursor() as cursor:
+                async with cursor.copy(COPY_WORKOUT_DATA_SQL) as copy:
+                    now = datetime.now(timezone.utc)
+                    for workout in workout_rows.workouts:
+                        await copy.write_row(copy_row(workout, now))
 
-        conn.commit()
-        cursor.close()
-        return workout_data
+        count = len(workout_rows.workouts)
+        return Workout_Batch_Result(inserted=count, batch_counts=[count])
 
+    except HTTPException:
+        raise  # Re-raise HTTP exceptions
     except Exception as e:
-        if conn:
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Error inserting data: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 
-# GET endpoint to retrieve all workout data
-@app.get("/workout_data", response_model=List[Workout_Data])
-def get_all_workout_data():
-    conn = None
+async def iter_ndjson_lines(request: Request):
+    """Yield (line_number, line) for each non-empty line of a streamed request body"""
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+# POST endpoint for streaming uploads, one Workout_Data JSON object per line (application/x-ndjson)
+# rows are copied as they arrive so the body never has to fit in memory
+@app.post("/workout_data/batch/ndjson", response_model=Workout_Batch_Result)
+async def create_workout_data_ndjson(request: Request):
+    batch_counts = []
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        # everything goes through one COPY in one transaction, a bad line rolls back the whole upload
+        async with get_db_connection() as conn:
+            async with conn.cursor() as cursor:
+                async with cursor.copy(COPY_WORKOUT_DATA_SQL) as copy:
+                    now = datetime.now(timezone.utc)
+                    batch_count = 0
+                    async for line_number, line in iter_ndjson_lines(request):
+                        try:
+                            workout = Workout_Data.model_validate_json(line)
+                        except ValidationError as e:
+                            raise HTTPException(status_code=422, detail=f"Invalid workout on line {line_number}: {str(e)}")
+
+                        await copy.write_row(copy_row(workout, now))
+                        batch_count += 1
+                        if batch_count == NDJSON_BATCH_SIZE:
+                            batch_counts.append(batch_count)
+                            batch_count = 0
+
+                    if batch_count:
+                        batch_counts.append(batch_count)
+
+        return Workout_Batch_Result(inserted=sum(batch_counts), batch_counts=batch_counts)
+
+    except HTTPException:
+        raise  # Re-raise HTTP exceptions
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error inserting data: {str(e)}")
 
-        cursor.execute("SELECT exercise_name, sets, reps FROM workout_data")
-        results = cursor.fetchall()
 
-        cursor.close()
+async def open_workout_stream(after: int) -> tuple:
+    """
+    Borrow a connection, open a named (server-side) cursor over every row after the given id and fetch the first
+    STREAM_CHUNK_SIZE rows, so pool and query errors still turn into a 503/500 before the response starts
+    Returns (stack, cursor, first rows), closing the stack returns the connection to the pool
+    """
+    stack = AsyncExitStack()
+    try:
+        conn = await stack.enter_async_context(get_db_connection())
+        cursor = await stack.enter_async_context(conn.cursor(name="workout_data_stream"))
+        await cursor.execute(
+            "SELECT id, exercise_name, sets, reps, date FROM workout_data WHERE id > %s ORDER BY id",
+            (after,)
+        )
+        rows = await cursor.fetchmany(STREAM_CHUNK_SIZE)
+    except BaseException as e:
+        await stack.__aexit__(type(e), e, e.__traceback__)
+        raise
+    return stack, cursor, rows
+
+
+async def stream_workout_data(stack: AsyncExitStack, cursor, rows: list, as_ndjson: bool):
+    """
+    Yield the rows of an open_workout_stream() as NDJSON lines or as one JSON array
+    Only STREAM_CHUNK_SIZE rows are in memory at a time, the connection is released when the last one is sent
+    """
+    async with stack:
+        first = True
+        if not as_ndjson:
+            yield "["
+        while rows:
+            items = [json.dumps({"id": row[0], "exercise_name": row[1], "sets": row[2], "reps": row[3],
+                                 "date": row[4].isoformat()})
+                     for row in rows]
+            if as_ndjson:
+                yield "\n".join(items) + "\n"
+            else:
+                yield ("" if first else ",") + ",".join(items)
+            first = False
+            rows = await cursor.fetchmany(STREAM_CHUNK_SIZE)
+        if not as_ndjson:
+            yield "]"
+
+
+# GET endpoint to retrieve workout data, one page at a time or streamed
+#   /workout_data?after=<id>&limit=<n> - keyset pagination, pass X-Next-After back as ?after= for the next page
+#   /workout_data?stream=ndjson|json - every row after ?after= streamed in chunks
+@app.get("/workout_data", response_model=List[Workout_Data_Record])
+async def get_all_workout_data(
+    response: Response,
+    after: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json)$"),
+):
+    if stream:
+        as_ndjson = stream == "ndjson"
+        try:
+            stack, cursor, rows = await open_workout_stream(after)
+        except HTTPException:
+            raise  # Re-raise HTTP exceptions
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
+        return StreamingResponse(
+            stream_workout_data(stack, cursor, rows, as_ndjson),
+            media_type="application/x-ndjson" if as_ndjson else "application/json",
+            # releases the connection if the body is never iterated (closing twice is a no-op)
+            background=BackgroundTask(stack.aclose),
+        )
 
-        # Convert results to list of Workout_Data objects
+    try:
+        async with get_db_connection() as conn:
+            async with conn.cursor() as cursor:
+                # uses the primary key index so every page costs the same no matter how deep it is
+                await cursor.execute(
+                    "SELECT id, exercise_name, sets, reps, date FROM workout_data WHERE id > %s ORDER BY id LIMIT %s",
+                    (after, limit)
+                )
+                results = await cursor.fetchall()
+
+        # Convert results to list of Workout_Data_Record objects
         workout_list = []
         for row in results:
-            workout_list.append(Workout_Data(
-                exercise_name=row[0],
-                sets=row[1],
-                reps=row[2],
-                # date=row[3]
+            workout_list.append(Workout_Data_Record(
+                id=row[0],
+                exercise_name=row[1],
+                sets=row[2],
+                reps=row[3],
+                date=row[4]
             ))
 
+        # a full page means there may be more rows
+        if len(workout_list) == limit:
+            response.headers["X-Next-After"] = str(workout_list[-1].id)
+
         return workout_list
 
+    except HTTPException:
+        raise  # Re-raise HTTP exceptions
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 
 # GET endpoint to retrieve workout data by exercise name
 @app.get("/workout_data/{exercise_name}", response_model=List[Workout_Data])
-def get_workout_by_exercise(exercise_name: str):
-    conn = None
+async def get_workout_by_exercise(exercise_name: str):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT exercise_name, sets, reps FROM workout_data WHERE exercise_name = %s",
-            (exercise_name,)
-        )
-        results = cursor.fetchall()
-
-        cursor.close()
+        async with get_db_connection() as conn:
+            async with conn.cursor() as cursor:
+                # served by the (exercise_name, date) index
+                await cursor.execute(
+                    "SELECT exercise_name, sets, reps, date FROM workout_data WHERE exercise_name = %s ORDER BY date",
+                    (exercise_name,)
+                )
+                results = await cursor.fetchall()
 
         if not results:
             raise HTTPException(status_code=404, detail=f"No workout data found for exercise: {exercise_name}")
@@ -151,7 +350,7 @@ def get_workout_by_exercise(exercise_name: str):
                 exercise_name=row[0],
                 sets=row[1],
                 reps=row[2],
-                # date=row[3]
+                date=row[3]
             ))
 
         return workout_list
@@ -160,48 +359,42 @@ def get_workout_by_exercise(exercise_name: str):
         raise  # Re-raise HTTP exceptions
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 
 # DELETE endpoint to remove workout data
 @app.delete("/workout_data/{exercise_name}")
-def delete_workout_by_exercise(exercise_name: str):
-    conn = None
+async def delete_workout_by_exercise(exercise_name: str):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Check if the exercise exists
-        cursor.execute("SELECT COUNT(*) FROM workout_data WHERE exercise_name = %s", (exercise_name,))
-        count = cursor.fetchone()[0]
-
-        if count == 0:
-            raise HTTPException(status_code=404, detail=f"No workout data found for exercise: {exercise_name}")
-
-        # Delete the exercise data
-        cursor.execute("DELETE FROM workout_data WHERE exercise_name = %s", (exercise_name,))
-        conn.commit()
-        cursor.close()
+        # raising inside the block rolls the transaction back
+        async with get_db_connection() as conn:
+            async with conn.cursor() as cursor:
+                # Delete and count in one indexed pass
+                await cursor.execute(
+                    """
+                    WITH deleted AS (
+                        DELETE FROM workout_data WHERE exercise_name = %s RETURNING 1
+                    )
+                    SELECT COUNT(*) FROM deleted
+                    """,
+                    (exercise_name,)
+                )
+                count = (await cursor.fetchone())[0]
+
+                if count == 0:
+                    raise HTTPException(status_code=404, detail=f"No workout data found for exercise: {exercise_name}")
 
         return {"message": f"Successfully deleted {count} workout entries for exercise: {exercise_name}"}
 
     except HTTPException:
         raise  # Re-raise HTTP exceptions
     except Exception as e:
-        if conn:
-            conn.rollback()
         raise HTTPException(status_code=500, detail=f"Error deleting data: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 
 # Add a health check endpoint
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "db_pool": get_pool_stats()}
 
 
 def main() -> None:
@@ -1,19 +1,26 @@
-import lmstudio as lms
+import asyncio
+import functools
+import hashlib
 import json
 import time
-from typing import Dict, Any, List, Optional, Tuple
-from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Optional, Union
+from collections import OrderedDict
 import sqlite3
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import numpy as np
-import openai
-from dotenv import load_dotenv
 import datetime
 import re
 import os
-from openai import OpenAI
-from openai import OpenAIError
+from exercise_matcher import ExerciseMatcher, MUSCLE_MAP, DEFAULT_USER_MAXES
+from response_cache import ResponseCache, response_key
+from workout_model import WorkoutLog
+from workout_store import WorkoutStore, get_workout_store
+from training_load import TrainingLoadTracker, CHRONIC_DAYS
+
+if TYPE_CHECKING:
+    from openai import OpenAI, AsyncOpenAI
+    from progress_charts import ProgressCharts
+
+# numpy, openai, matplotlib and dotenv are imported where they are first used, so starting the CLI or
+# importing analyze_workout doesn't pay for them (see bench_import_time.py)
 
 """
 v0.0.1:
@@ -26,6 +33,33 @@ v0.0.2 09/23/25:
 # Global workout storage
 current_workout_data = None
 
+# User estimated 1RMs for percentage calculations
+user_maxes = dict(DEFAULT_USER_MAXES)
+
+# analyze_workout results keyed by a hash of the workout contents, see cached_analysis
+# bounded so serving many users can't grow it forever, cleared whenever a new workout is logged or the
+# exercise catalog changes
+ANALYSIS_CACHE_SIZE = 256
+_analysis_cache: "OrderedDict[str, dict]" = OrderedDict()
+analysis_cache_stats = {"hits": 0, "misses": 0, "serializations": 0}
+
+# muscle groups + 1RM lookup by exercise name, built once
+exercise_matcher = ExerciseMatcher(MUSCLE_MAP, user_maxes)
+
+
+def set_exercise_catalog(muscle_map: Optional[Dict[str, List[str]]] = None,
+                         maxes: Optional[Dict[str, float]] = None) -> None:
+    """Swap in a user supplied exercise catalog and/or 1RM table"""
+    global user_maxes, exercise_matcher, _training_load
+
+    if maxes is not None:
+        user_maxes = dict(maxes)
+    exercise_matcher = ExerciseMatcher(muscle_map if muscle_map is not None else exercise_matcher.muscle_map,
+                                       user_maxes)
+    # analyses (and the training load built from them) depend on the catalog, so they are recomputed
+    clear_analysis_cache()
+    _training_load = None
+
 
 def collect_workout_data():
     """
@@ -47,25 +81,6 @@ def collect_workout_data():
     exercise_count = 1
     all_muscle_groups = set()
 
-    # Simple muscle group mapping
-    muscle_map = {
-        "squat": ["quads", "glutes"],
-        "bench": ["chest", "shoulders", "triceps"],
-        "deadlift": ["back", "hamstrings", "glutes"],
-        "row": ["back", "biceps"],
-        "pullup": ["back", "biceps"],
-        "pull": ["back", "biceps"],
-        "press": ["shoulders", "triceps"],
-        "curl": ["biceps"],
-        "tricep": ["triceps"],
-        "dip": ["chest", "triceps"],
-        "lunge": ["quads", "glutes"],
-        "leg": ["quads", "hamstrings"],
-        "calf": ["calves"],
-        "abs": ["core"],
-        "plank": ["core"]
-    }
-
     while True:
         print(f"\nExercise #{exercise_count}")
         print("-" * 20)
@@ -90,10 +105,9 @@ def collect_workout_data():
             exercises[exercise_name] = (sets, reps, weight, rpe)
 
             # Add muscle groups
-            for key, muscles in muscle_map.items():
-                if key in exercise_name:
-                    all_muscle_groups.update(muscles)
-                    break
+            match = exercise_matcher.match(exercise_name)
+            if match.muscle_key is not None:
+                all_muscle_groups.update(match.muscles)
             else:
                 all_muscle_groups.add("core")  # default if not found
 
@@ -132,6 +146,12 @@ def collect_workout_data():
         total_volume = sets * reps * weight
         print(f"• {name.title()}: {sets}x{reps} @ {weight}lbs (RPE {rpe}) - Volume: {total_volume}lbs")
 
+    # keep a history so progress can be trended later
+    try:
+        workout_history().add_workout(workout_data)
+    except sqlite3.Error as e:
+        print(f"Could not save workout to history: {e}")
+
     return workout_data
 
 
@@ -145,13 +165,6 @@ def analyze_workout(workout: Optional[Dict] = None) -> dict:
     if not workout:
         return {"error": "No workout data available. Please log a workout first."}
 
-    # User estimated 1RMs for percentage calculations
-    user_maxes = {
-        "squat": 405, "bench": 260, "deadlift": 500,
-        "row": 200, "press": 150, "curl": 100,
-        "pullup": 200, "dip": 250
-    }
-
     total_load = 0.0
     workout_time = workout.get("time", 1)
     muscle_groups = workout.get("muscles_targeted", "")
@@ -174,14 +187,11 @@ def analyze_workout(workout: Optional[Dict] = None) -> dict:
                     base_load = volume * intensity_factor
 
                     # Adjust for percentage of estimated max
-                    max_weight = None
-                    for max_exercise, max_val in user_maxes.items():
-                        if max_exercise in exercise_name.lower():
-                            max_weight = max_val
-                            percent_of_max = (weight / max_val) * 100
-                            # Bonus for higher percentage work
-                            base_load *= (1 + (percent_of_max / 100) * 0.5)
-                            break
+                    max_weight = exercise_matcher.match(exercise_name).max_weight
+                    if max_weight is not None:
+                        percent_of_max = (weight / max_weight) * 100
+                        # Bonus for higher percentage work
+                        base_load *= (1 + (percent_of_max / 100) * 0.5)
 
                     total_load += base_load
 
@@ -228,6 +238,291 @@ def analyze_workout(workout: Optional[Dict] = None) -> dict:
     }
 
 
+def workout_fingerprint(workout: Dict) -> str:
+    """Stable content hash of a workout, same contents -> same hash regardless of key order"""
+    return hashlib.sha256(json.dumps(workout, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _analysis_entry(workout: Dict) -> dict:
+    key = workout_fingerprint(workout)
+    entry = _analysis_cache.get(key)
+    if entry is not None:
+        _analysis_cache.move_to_end(key)
+        analysis_cache_stats["hits"] += 1
+        return entry
+
+    analysis_cache_stats["misses"] += 1
+    entry = {"analysis": analyze_workout(workout), "json": None}
+    _analysis_cache[key] = entry
+    while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+    return entry
+
+
+def cached_analysis(workout: Optional[Dict] = None) -> dict:
+    """
+    analyze_workout, but each distinct workout is only analyzed once
+    The returned dict is shared between callers, don't modify it
+    """
+    if workout is None:
+        workout = current_workout_data
+    if not workout:
+        return analyze_workout(workout)
+    return _analysis_entry(workout)["analysis"]
+
+
+def cached_analysis_json(workout: Optional[Dict] = None) -> str:
+    """The analysis serialized for prompts (indent=2), serialized once per workout"""
+    if workout is None:
+        workout = current_workout_data
+    if not workout:
+        return json.dumps(analyze_workout(workout), indent=2)
+    entry = _analysis_entry(workout)
+    if entry["json"] is None:
+        analysis_cache_stats["serializations"] += 1
+        entry["json"] = json.dumps(entry["analysis"], indent=2)
+    return entry["json"]
+
+
+def clear_analysis_cache() -> None:
+    _analysis_cache.clear()
+
+
+def _workout_columns(workouts: List[Optional[Dict]], max_names: List[str]) -> dict:
+    """
+    Flatten many workouts into columnar numpy arrays, one entry per exercise
+    workout_idx maps each exercise back to its position in workouts
+    """
+    import numpy as np
+
+    names, sets, reps, weight, rpe, workout_idx = [], [], [], [], [], []
+    workout_times, muscle_sets = [], []
+    for i, workout in enumerate(workouts):
+        if not workout:
+            workout_times.append(1)
+            muscle_sets.append(set())
+            continue
+        workout_times.append(workout.get("time", 1))
+        muscle_groups = workout.get("muscles_targeted", "")
+        muscle_sets.append(set(muscle_groups.split(", ")) if muscle_groups else set())
+
+        for exercises in workout.values():
+            if isinstance(exercises, dict):
+                for exercise_name, exercise_data in exercises.items():
+                    if isinstance(exercise_data, tuple) and len(exercise_data) == 4:
+                        names.append(exercise_name)
+                        sets.append(exercise_data[0])
+                        reps.append(exercise_data[1])
+                        weight.append(exercise_data[2])
+                        rpe.append(exercise_data[3])
+                        workout_idx.append(i)
+
+    # exercise names repeat a lot across a history, only look each one up once
+    max_positions = {max_name: i for i, max_name in enumerate(max_names)}
+    max_lookup = {}
+    for name in names:
+        if name not in max_lookup:
+            max_key = exercise_matcher.match(name).max_key
+            max_lookup[name] = max_positions[max_key] if max_key is not None else -1
+
+    return {
+        "names": names,
+        "sets": np.array(sets, dtype=np.int64),
+        "reps": np.array(reps, dtype=np.int64),
+        "weight": np.array(weight, dtype=np.float64),
+        "rpe": np.array(rpe, dtype=np.int64),
+        "workout_idx": np.array(workout_idx, dtype=np.int64),
+        "max_idx": np.array([max_lookup[name] for name in names], dtype=np.int64),
+        "workout_times": workout_times,
+        "muscle_sets": muscle_sets,
+        "present": [bool(workout) for workout in workouts],
+    }
+
+
+def _log_columns(log: WorkoutLog, max_names: List[str]) -> dict:
+    """Same columns as _workout_columns, read straight from a WorkoutLog's arrays"""
+    import numpy as np
+
+    cols = log.columns()
+    name_ids = cols["name_ids"]
+
+    # one lookup per distinct exercise name
+    max_positions = {max_name: i for i, max_name in enumerate(max_names)}
+    name_max_idx = []
+    for name in log.names:
+        max_key = exercise_matcher.match(name).max_key
+        name_max_idx.append(max_positions[max_key] if max_key is not None else -1)
+
+    return {
+        "names": [log.names[i] for i in name_ids.tolist()],
+        "sets": cols["sets"].astype(np.int64),
+        "reps": cols["reps"].astype(np.int64),
+        "weight": cols["weight"].copy(),
+        "rpe": cols["rpe"].astype(np.int64),
+        "workout_idx": cols["workout_idx"].astype(np.int64),
+        "max_idx": np.array(name_max_idx, dtype=np.int64)[name_ids],
+        "workout_times": log.times.tolist(),
+        "muscle_sets": [set(log.muscle_groups[m]) for m in log.muscle_ids],
+        "present": [True] * len(log),
+    }
+
+
+def analyze_workouts_batch(workouts: Union[List[Optional[Dict]], WorkoutLog],
+                           include_breakdown: bool = True) -> List[dict]:
+    """
+    Analyze many workouts at once, same results as calling analyze_workout on each one
+    Takes a list of legacy workout dicts or a WorkoutLog
+    Set include_breakdown=False to skip building the per-exercise details (faster for dashboards)
+    """
+    import numpy as np
+
+    n = len(workouts)
+    max_names = list(user_maxes.keys())
+    max_values = np.array([user_maxes[name] for name in max_names], dtype=np.float64)
+
+    if isinstance(workouts, WorkoutLog):
+        cols = _log_columns(workouts, max_names)
+    else:
+        cols = _workout_columns(workouts, max_names)
+    workout_idx = cols["workout_idx"]
+    weight = cols["weight"]
+
+    # per exercise, same operation order as analyze_workout so the floats match exactly
+    volume = cols["sets"] * cols["reps"] * weight
+    base_load = volume * (cols["rpe"] / 10)
+    has_max = cols["max_idx"] >= 0
+    max_weight = np.where(has_max, max_values[np.maximum(cols["max_idx"], 0)], 1.0)
+    percent_of_max = (weight / max_weight) * 100
+    base_load = np.where(has_max, base_load * (1 + (percent_of_max / 100) * 0.5), base_load)
+
+    # per workout, bincount adds in exercise order like the loop does
+    exercise_counts = np.bincount(workout_idx, minlength=n)
+    total_load = np.bincount(workout_idx, weights=base_load, minlength=n)
+    total_volume = np.bincount(workout_idx, weights=volume, minlength=n)
+
+    workout_times = cols["workout_times"]
+    muscle_sets = cols["muscle_sets"]
+
+    density = total_load / np.maximum(np.array(workout_times, dtype=np.float64), 1)
+    muscle_work_multiplier = 1 + (np.array([len(mg) for mg in muscle_sets], dtype=np.int64) - 1) * 0.15
+    final_intensity = density * muscle_work_multiplier
+    intensity_levels = np.select(
+        [final_intensity > 100, final_intensity > 60, final_intensity > 30],
+        ["Very High", "High", "Moderate"],
+        default="Light"
+    )
+
+    breakdowns = [[] for _ in range(n)]
+    if include_breakdown:
+        # plain python lists, indexing numpy arrays one element at a time is slow
+        rows = zip(cols["names"], workout_idx.tolist(), cols["sets"].tolist(), cols["reps"].tolist(),
+                   weight.tolist(), cols["rpe"].tolist(), volume.tolist(), base_load.tolist(),
+                   percent_of_max.tolist(), has_max.tolist())
+        for name, i, sets, reps, w, rpe, vol, load, percent, matched in rows:
+            breakdowns[i].append({
+                "name": name.title(),
+                "sets": sets,
+                "reps": reps,
+                "weight": w,
+                "rpe": rpe,
+                "volume": vol,
+                "load_contribution": round(load, 1),
+                "estimated_1rm_percent": round(percent, 1) if matched else None
+            })
+
+    results = []
+    for i in range(n):
+        if not cols["present"][i]:
+            results.append({"error": "No workout data available. Please log a workout first."})
+            continue
+        if exercise_counts[i] == 0:
+            results.append({"error": "No valid exercises found in workout"})
+            continue
+
+        result = {
+            "total_load": round(float(total_load[i]), 1),
+            "density": round(float(density[i]), 2),
+            "muscle_work_multiplier": round(float(muscle_work_multiplier[i]), 2),
+            "intensity_score": round(float(final_intensity[i]), 1),
+            "intensity_level": str(intensity_levels[i]),
+            "workout_time": workout_times[i],
+            "exercises_count": int(exercise_counts[i]),
+            "muscle_groups": sorted(list(muscle_sets[i])),
+        }
+        if include_breakdown:
+            result["exercise_breakdown"] = breakdowns[i]
+        result["total_volume"] = float(total_volume[i])
+        results.append(result)
+
+    return results
+
+
+def analyze_history(start: Optional[str] = None, end: Optional[str] = None,
+                    include_breakdown: bool = False) -> List[dict]:
+    """Analysis of every stored workout between start and end (YYYY-MM-DD, inclusive), oldest first"""
+    log = workout_history().workout_log_between(start, end)
+    results = analyze_workouts_batch(log, include_breakdown=include_breakdown)
+    for i, result in enumerate(results):
+        result["date"] = log.dates[i]
+    return results
+
+
+# rolling acute/chronic load, seeded from the history store on first use and then updated per logged workout
+_training_load: Optional[TrainingLoadTracker] = None
+
+
+def get_training_load() -> TrainingLoadTracker:
+    global _training_load
+
+    if _training_load is None:
+        tracker = TrainingLoadTracker(lambda name: exercise_matcher.match(name).muscles)
+        # only the chronic window can affect the numbers, older history doesn't need to be read
+        since = datetime.date.today() - datetime.timedelta(days=CHRONIC_DAYS - 1)
+        try:
+            history = workout_history().workout_log_between(since)
+            tracker.add_workouts(zip(history.dates, analyze_workouts_batch(history)))
+        except sqlite3.Error as e:
+            print(f"Could not load workout history: {e}")
+        _training_load = tracker
+    return _training_load
+
+
+def record_training_load(workout: Dict) -> None:
+    """Add a newly logged workout to the rolling load (the store already has it if the tracker isn't built yet)"""
+    if _training_load is not None:
+        _training_load.add_workout(workout.get("date") or datetime.date.today(), cached_analysis(workout))
+
+
+def training_load_context() -> dict:
+    """Acute/chronic load, ACWR and weekly volume as of today, for the coach prompts"""
+    return get_training_load().summary(as_of=datetime.date.today())
+
+
+# chart renderer over the history store, CHART_CACHE_DIR picks where rendered charts are kept
+_progress_charts: Optional["ProgressCharts"] = None
+
+
+def get_progress_charts() -> "ProgressCharts":
+    global _progress_charts
+
+    if _progress_charts is None:
+        from progress_charts import ProgressCharts
+        _progress_charts = ProgressCharts(workout_history(), analyze_workouts_batch,
+                                          lambda name: exercise_matcher.match(name).muscles,
+                                          cache_dir=os.getenv("CHART_CACHE_DIR", ".chart_cache"))
+    return _progress_charts
+
+
+def save_progress_chart(kind: str, fmt: str = "png", days: int = 90) -> str:
+    """Render one progress chart over the last `days` days to progress_<kind>.<fmt>, returns the file name"""
+    start = datetime.date.today() - datetime.timedelta(days=days - 1)
+    data = get_progress_charts().chart(kind, fmt, start=start)
+    filename = f"progress_{kind}.{fmt}"
+    with open(filename, "wb") as f:
+        f.write(data)
+    return filename
+
+
 def meal_rec(workout: Optional[Dict] = None, macros: Optional[Dict] = None) -> dict:
     """Meal recommendations based on workout analysis"""
     global current_workout_data
@@ -249,8 +544,8 @@ def meal_rec(workout: Optional[Dict] = None, macros: Optional[Dict] = None) -> d
             }
         }
 
-    # Analyze the workout first
-    analysis = analyze_workout(workout)
+    # Analyze the workout first (reuses the analysis if this workout was already analyzed)
+    analysis = cached_analysis(workout)
     if "error" in analysis:
         return analysis
 
@@ -304,7 +599,7 @@ def recovery(sleep: float, muscle_groups: Optional[List] = None, intensity_level
 
     # Use workout data if available
     if muscle_groups is None and current_workout_data:
-        analysis = analyze_workout(current_workout_data)
+        analysis = cached_analysis(current_workout_data)
         if "muscle_groups" in analysis:
             muscle_groups = analysis["muscle_groups"]
             intensity_level = analysis["intensity_level"].lower()
@@ -374,8 +669,17 @@ def recovery(sleep: float, muscle_groups: Optional[List] = None, intensity_level
 
 # open ai old method (not really using tools but openai wont let me connect to a better machine with open gpt)
 
-# load env var to get the connection
-load_dotenv()
+@functools.cache
+def load_env() -> None:
+    """Load .env once, before the first thing that reads the connection settings"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def workout_history() -> WorkoutStore:
+    """The shared history store, with WORKOUT_DB_PATH from .env whichever frontend touches it first"""
+    load_env()
+    return get_workout_store()
 
 coach_mike = """You are Coach Mike, an experienced fitness coach and nutritionist. Your role is to provide clear, safe, and actionable guidance on all aspects of health and fitness, including:
 
@@ -441,62 +745,314 @@ Guidelines:
 """
 
 
-def connect_to_gpt(prompt_txt: str, include_context: bool = False):
-    global current_workout_data
-    # model parameters:
-    llm_con = os.getenv("LMS_CONN")
-    default_system_prompt = coach_mike
+# model parameters:
+LLM_MODEL = "unsloth/gpt-oss-120b"
+LLM_PARAMS = {
+    "max_tokens": 1500,
+    "frequency_penalty": 0.7,
+    "reasoning_effort": "medium",
+    "temperature": 1.0,
+}
 
-    client = OpenAI(
-        base_url=llm_con,
-        api_key="a"
-    )
+# one client per process so the http connection pool (keep-alive) is reused between messages
+_llm_client = None
+
+# identical requests within LLM_CACHE_TTL seconds reuse the stored reply, LLM_CACHE_SIZE=0 turns this off
+_response_cache = None
+
+
+def get_llm_client() -> "OpenAI":
+    global _llm_client
+
+    if _llm_client is None:
+        from openai import OpenAI
+
+        load_env()
+        _llm_client = OpenAI(
+            base_url=os.getenv("LMS_CONN"),
+            api_key="a"
+        )
+    return _llm_client
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+
+    if _response_cache is None:
+        load_env()
+        _response_cache = ResponseCache(max_size=int(os.getenv("LLM_CACHE_SIZE", "128")),
+                                        ttl=float(os.getenv("LLM_CACHE_TTL", "600")))
+    return _response_cache
+
+
+def build_prompt(prompt_txt: str, include_context: bool = False) -> str:
+    global current_workout_data
 
     full_prompt = prompt_txt
 
     if include_context and current_workout_data:
         # Add workout context to the prompt
-        workout_analysis = analyze_workout(current_workout_data)
-        context = f"\n\nCurrent workout context: {json.dumps(workout_analysis, indent=2)}"
+        context = f"\n\nCurrent workout context: {cached_analysis_json(current_workout_data)}"
+        context += f"\n\nTraining load (last 7 / 28 days): {json.dumps(training_load_context(), indent=2)}"
         full_prompt = prompt_txt + context
 
-    history = [
+    return full_prompt
+
+
+def tool_prompt(prompt_txt: str, data: Dict) -> str:
+    """A tool prompt followed by the tool's result as JSON, so the model sees the numbers it is asked about"""
+    return f"{prompt_txt}\n\n{json.dumps(data, indent=2, default=str)}"
+
+
+def chat_history(full_prompt: str) -> List[Dict[str, str]]:
+    return [
         {"role": "system",
          "content": coach_mike},
         {"role": "user",
-         "content":full_prompt}
+         "content": full_prompt}
     ]
 
+
+def llm_error_message(e: Exception) -> str:
+    import openai
+
+    if isinstance(e, openai.APIConnectionError):
+        return f"OpenAI Connection error: the server could not be reached: {e}"
+    if isinstance(e, openai.APIStatusError):
+        return f"OpenAI Rate Limit Error: A 429 status code was received: {e}"
+    if isinstance(e, openai.APIError):
+        return f"API error: {e}"
+    return f"Unexpected error: {e}"
+
+
+def connect_to_gpt(prompt_txt: str, include_context: bool = False):
+    client = get_llm_client()
+    full_prompt = build_prompt(prompt_txt, include_context)
+    history = chat_history(full_prompt)
+
+    cache = get_response_cache()
+    cache_key = response_key(LLM_MODEL, coach_mike, full_prompt, LLM_PARAMS)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         completion = client.chat.completions.create(
-            model="unsloth/gpt-oss-120b",
+            model=LLM_MODEL,
             messages=history,
-            max_tokens=1500,
-            frequency_penalty=0.7,
-            reasoning_effort="medium",
-            temperature=1.0,
+            **LLM_PARAMS
         )
 
-        return completion.choices[0].message.content.strip()
-    except openai.APIConnectionError as e:
-        return f"OpenAI Connection error: the server could not be reached: {e}"
-    except openai.APIStatusError as e:
-        return f"OpenAI Rate Limit Error: A 429 status code was received: {e}"
-    except openai.APIError as e:
-        return f"API error: {e}"
+        response = completion.choices[0].message.content.strip()
+        # errors are returned as text too, only real replies are cached
+        cache.put(cache_key, response)
+        return response
     except Exception as e:
-        return f"Unexpected error: {e}"
+        return llm_error_message(e)
 
 
-def process_user_command(user_input: str) -> str:
+class CompletionStream:
+    """
+    Coach Mike's reply as it is generated, iterate over it to get text pieces as they arrive
+    Timing stats (time to first token, tokens/sec) and the full text are available once iteration finishes
+    """
+
+    def __init__(self, prompt_txt: str, include_context: bool = False, prefix: str = ""):
+        self.full_prompt = build_prompt(prompt_txt, include_context)
+        self.prefix = prefix  # printed before the reply, not counted in the stats
+        self.text = ""
+        self.time_to_first_token: Optional[float] = None
+        self.elapsed: Optional[float] = None
+        self.tokens = 0
+        self.cached = False
+
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        if not self.tokens or self.elapsed is None or self.time_to_first_token is None:
+            return None
+        generating = self.elapsed - self.time_to_first_token
+        return self.tokens / generating if generating > 0 else None
+
+    def stats_line(self) -> str:
+        if self.cached:
+            return "(cached response)"
+        if self.time_to_first_token is None:
+            return "(no response)"
+        rate = f"{self.tokens_per_sec:.1f} tokens/sec" if self.tokens_per_sec else "n/a tokens/sec"
+        return f"(first token {self.time_to_first_token:.2f}s, {self.tokens} tokens in {self.elapsed:.2f}s, {rate})"
+
+    def __iter__(self) -> Iterator[str]:
+        if self.prefix:
+            yield self.prefix
+
+        start = time.perf_counter()
+        cache = get_response_cache()
+        cache_key = response_key(LLM_MODEL, coach_mike, self.full_prompt, LLM_PARAMS)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            self.cached = True
+            self.text = cached
+            self.elapsed = time.perf_counter() - start
+            yield cached
+            return
+
+        parts = []
+        chunk_count = 0
+        usage_tokens = None
+        try:
+            stream = get_llm_client().chat.completions.create(
+                model=LLM_MODEL,
+                messages=chat_history(self.full_prompt),
+                stream=True,
+                stream_options={"include_usage": True},
+                **LLM_PARAMS
+            )
+            for chunk in stream:
+                # the last chunk only carries token usage
+                if getattr(chunk, "usage", None):
+                    usage_tokens = chunk.usage.completion_tokens
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if not parts:
+                    delta = delta.lstrip()
+                    if not delta:
+                        continue
+                    self.time_to_first_token = time.perf_counter() - start
+                parts.append(delta)
+                chunk_count += 1
+                yield delta
+        except Exception as e:
+            message = llm_error_message(e)
+            parts.append(message)
+            yield message
+            return
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self.text = "".join(parts)
+            # servers that don't report usage send roughly one token per chunk
+            self.tokens = usage_tokens if usage_tokens is not None else chunk_count
+
+        response = self.text.strip()
+        if response:
+            cache.put(cache_key, response)
+
+
+async def async_connect_to_gpt(client: "AsyncOpenAI", prompt_txt: str, include_context: bool = False) -> str:
+    """Async version of connect_to_gpt, errors propagate so the caller can handle timeouts/cancellation"""
+    full_prompt = build_prompt(prompt_txt, include_context)
+
+    cache = get_response_cache()
+    cache_key = response_key(LLM_MODEL, coach_mike, full_prompt, LLM_PARAMS)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    completion = await client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=chat_history(full_prompt),
+        **LLM_PARAMS
+    )
+    response = completion.choices[0].message.content.strip()
+    cache.put(cache_key, response)
+    return response
+
+
+async def full_report(sleep_hours: float = 7.0, timeout: Optional[float] = None) -> str:
+    """
+    Workout analysis, nutrition and recovery summaries in one go
+    The three LLM calls run concurrently, each one is cancelled if it takes longer than timeout seconds
+    (LLM_TIMEOUT env var, default 120)
+    """
+    global current_workout_data
+
+    if not current_workout_data:
+        return "No workout data available. Please log a workout first using 'log workout'."
+
+    load_env()
+    if timeout is None:
+        timeout = float(os.getenv("LLM_TIMEOUT", "120"))
+
+    # run each tool once up front
+    analysis = cached_analysis(current_workout_data)
+    if "error" in analysis:
+        return analysis["error"]
+    meal_recs = meal_rec(current_workout_data)
+    recovery_plan = recovery(sleep_hours, analysis["muscle_groups"], analysis["intensity_level"].lower())
+
+    # (title, prompt, data, include_context), the analysis already is the workout context
+    sections = [
+        ("Workout Analysis", analyze_prompt, analysis, False),
+        ("Nutrition", meal_rec_prompt, meal_recs, True),
+        (f"Recovery ({sleep_hours} hours of sleep)", recovery_prompt, recovery_plan, True),
+    ]
+
+    # async client lives for this report only, its connections belong to this event loop
+    from openai import AsyncOpenAI
+
+    async with AsyncOpenAI(base_url=os.getenv("LMS_CONN"), api_key="a") as client:
+        results = await asyncio.gather(
+            *[asyncio.wait_for(async_connect_to_gpt(client, tool_prompt(prompt, data), include_context), timeout)
+              for _, prompt, data, include_context in sections],
+            return_exceptions=True
+        )
+
+    report = []
+    for (title, *_), result in zip(sections, results):
+        if isinstance(result, asyncio.TimeoutError):
+            result = f"Timed out after {timeout:.0f} seconds, try again."
+        elif isinstance(result, Exception):
+            result = llm_error_message(result)
+        report.append(f"{title}:\n{result}")
+
+    return "\n\n".join(report)
+
+
+def stream_gpt(prompt_txt: str, include_context: bool = False, prefix: str = "") -> CompletionStream:
+    """Streaming version of connect_to_gpt for the chat loop and other frontends"""
+    return CompletionStream(prompt_txt, include_context, prefix)
+
+
+def report_command(user_input: str) -> Optional[float]:
+    """Sleep hours for "report" (7) or "report 6.5", None for anything else such as "reports say creatine..." """
+    parts = user_input.split()
+    if not parts or parts[0] != 'report' or len(parts) > 2:
+        return None
+    try:
+        return float(parts[1]) if len(parts) > 1 else 7.0
+    except ValueError:
+        return None
+
+
+def chart_command(user_input: str) -> Optional[tuple]:
+    """
+    (kind, format) for "chart", "chart one_rep_max" or "chart one_rep_max svg"
+    None for anything else, so "chart my squat progress please" still goes to Coach Mike
+    """
+    parts = user_input.split()
+    if not parts or parts[0] != 'chart' or len(parts) > 3:
+        return None
+    from progress_charts import CHART_KINDS, CHART_FORMATS
+
+    kind = parts[1] if len(parts) > 1 else "load"
+    fmt = parts[2] if len(parts) > 2 else "png"
+    if kind not in CHART_KINDS or fmt not in CHART_FORMATS:
+        return None
+    return kind, fmt
+
+
+def process_user_command(user_input: str, stream: bool = False) -> Union[str, CompletionStream]:
     """
     Process user commands and route to appropriate functions
 
     Args:
         user_input: User's input string
+        stream: Return a CompletionStream instead of waiting for the full reply on commands that call the LLM
 
     Returns:
-        Response string
+        Response string, or a CompletionStream when stream is set and the LLM is involved
     """
     global current_workout_data
 
@@ -507,6 +1063,8 @@ def process_user_command(user_input: str) -> str:
         workout_data = collect_workout_data()
         if workout_data:
             current_workout_data = workout_data
+            clear_analysis_cache()
+            record_training_load(workout_data)
             # analysis = analyze_workout(workout_data)
             return f"Workout logged successfully!"
         else:
@@ -514,8 +1072,11 @@ def process_user_command(user_input: str) -> str:
 
     elif user_input in ['analyze', 'analysis']:
         if current_workout_data:
-            analysis = analyze_workout(current_workout_data)
-            analysis_chat = connect_to_gpt(analyze_prompt, analysis)
+            analysis = cached_analysis(current_workout_data)
+            # the analysis is the workout context, no need to add it twice
+            if stream:
+                return stream_gpt(tool_prompt(analyze_prompt, analysis))
+            analysis_chat = connect_to_gpt(tool_prompt(analyze_prompt, analysis))
             return analysis_chat
         else:
             return "No workout data available. Please log a workout first using 'log workout'."
@@ -523,7 +1084,9 @@ def process_user_command(user_input: str) -> str:
     elif user_input in ['meal', 'nutrition', 'macros']:
         if current_workout_data:
             meal_recs = meal_rec(current_workout_data)
-            meal_rec_chat = connect_to_gpt(meal_rec_prompt, meal_recs)
+            if stream:
+                return stream_gpt(tool_prompt(meal_rec_prompt, meal_recs), include_context=True)
+            meal_rec_chat = connect_to_gpt(tool_prompt(meal_rec_prompt, meal_recs), include_context=True)
             return meal_rec_chat
         else:
             return "No workout data available for meal recommendations. Please log a workout first."
@@ -537,9 +1100,20 @@ def process_user_command(user_input: str) -> str:
             sleep_hours = 7.0
 
         recovery_plan = recovery(sleep_hours)
-        recovery_resp = connect_to_gpt(recovery_prompt, recovery_plan)
+        if stream:
+            return stream_gpt(tool_prompt(recovery_prompt, recovery_plan), include_context=True,
+                              prefix=f"Recovery Plan based on {sleep_hours} of sleep: ")
+        recovery_resp = connect_to_gpt(tool_prompt(recovery_prompt, recovery_plan), include_context=True)
         return f"Recovery Plan based on {sleep_hours} of sleep: {recovery_resp}"
 
+    elif (sleep_hours := report_command(user_input)) is not None:
+        # analysis + meal + recovery together
+        return asyncio.run(full_report(sleep_hours))
+
+    elif (chart := chart_command(user_input)) is not None:
+        kind, fmt = chart
+        return f"Chart saved to {save_progress_chart(kind, fmt)}"
+
     elif user_input in ['help', 'commands']:
         return """Available commands:
 
@@ -547,6 +1121,8 @@ def process_user_command(user_input: str) -> str:
 • 'analyze' - Show analysis of current workout
 • 'meal' - Get meal recommendations based on workout
 • 'recovery [hours]' - Get recovery plan (optionally specify sleep hours)
+• 'report [hours]' - Analysis, meal and recovery summaries together
+• 'chart [load|muscle_volume|one_rep_max] [png|svg]' - Save a progress chart for the last 90 days
 • 'help' - Show this help message
 • 'quit' - Exit the program
 • Any other text will be sent to Coach Mike for fitness advice
@@ -559,10 +1135,13 @@ Current workout logged: {'Yes' if current_workout_data else 'No'}"""
     else:
         # Send to LLM with workout context if available
         include_context = current_workout_data is not None
+        if stream:
+            return stream_gpt(user_input, include_context=include_context)
         return connect_to_gpt(user_input, include_context=include_context)
 
 def main():
     """main program chat loop"""
+    load_env()
     print("Welcome! I'm Coach Mike, your personal workout coach!")
     print("-"*50)
     print("Type 'help' for available commands or just ask me anything about fitness!")
@@ -578,13 +1157,22 @@ def main():
                 continue
 
             conversation_history.append(user_input)  # store user messages
-            response = process_user_command(user_input)
+            response = process_user_command(user_input, stream=True)
 
             if response == "q" or response == "quit":
                 print("thanks for using coach mike!")
                 break
 
-            print("Coach Mike: ", response)
+            if isinstance(response, CompletionStream):
+                # print the reply as it is generated
+                print("Coach Mike: ", end="", flush=True)
+                for text in response:
+                    print(text, end="", flush=True)
+                print()
+                print(response.stats_line())
+                response = response.prefix + response.text
+            else:
+                print("Coach Mike: ", response)
             conversation_history.append(response)
 
         except KeyboardInterrupt:
@@ -0,0 +1,61 @@
+import argparse
+import random
+import time
+from agents import analyze_workout, analyze_workouts_batch
+
+# benchmark: per-workout analyze_workout loop vs analyze_workouts_batch
+# usage: python bench_analyze.py --workouts 5000
+
+EXERCISES = ["back squat", "bench press", "deadlift", "barbell row", "overhead press",
+             "bicep curl", "pullup", "dips", "leg press", "plank", "calf raise", "lunge"]
+
+
+def make_workouts(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    workouts = []
+    for i in range(n):
+        exercises = {}
+        for name in rng.sample(EXERCISES, rng.randint(3, 8)):
+            exercises[name] = (rng.randint(2, 5), rng.randint(3, 12), float(rng.randrange(45, 405, 5)),
+                               rng.randint(5, 10))
+        workouts.append({
+            f"workout_{i}": exercises,
+            "time": rng.randint(30, 90),
+            "muscles_targeted": "back, biceps, chest, quads",
+            "date": "2025-01-01",
+            "exercise_count": len(exercises)
+        })
+    return workouts
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="workout analysis benchmark")
+    parser.add_argument("--workouts", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workouts = make_workouts(args.workouts)
+    assert analyze_workouts_batch(workouts) == [analyze_workout(w) for w in workouts]
+
+    loop = best_of(lambda: [analyze_workout(w) for w in workouts], args.repeat)
+    batch = best_of(lambda: analyze_workouts_batch(workouts), args.repeat)
+    summary = best_of(lambda: analyze_workouts_batch(workouts, include_breakdown=False), args.repeat)
+
+    print(f"{args.workouts} workouts, best of {args.repeat}")
+    print("-" * 50)
+    print(f"analyze_workout loop        {loop * 1000:9.1f} ms")
+    print(f"batch                       {batch * 1000:9.1f} ms  ({loop / batch:.1f}x)")
+    print(f"batch, no breakdown         {summary * 1000:9.1f} ms  ({loop / summary:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import os
+import statistics
+import time
+import numpy as np
+import psycopg
+from dotenv import load_dotenv
+from pgvector.psycopg import register_vector
+
+# benchmark: recall@k and latency of pgvector ANN indexes against exact search, on a synthetic corpus
+# builds each index on a scratch table in the database at COCOINDEX_DATABASE_URL (or --dsn), then sweeps the
+# query-time knob (hnsw.ef_search / ivfflat.probes) and prints one row per setting: the trade-off curve
+# usage: python bench_ann_index.py --chunks 50000 --queries 200 --top-k 5
+
+TABLE = "bench_ann_embeddings"
+
+# (index kind, build parameters, query-time values to sweep)
+INDEX_CONFIGS = [
+    ("hnsw", {"m": 16, "ef_construction": 64}, [10, 20, 40, 80, 160]),
+    ("hnsw", {"m": 32, "ef_construction": 128}, [10, 20, 40, 80, 160]),
+    ("ivfflat", {"lists": 100}, [1, 4, 10, 20]),
+    ("ivfflat", {"lists": 400}, [1, 4, 10, 20, 40]),
+]
+KNOB = {"hnsw": "hnsw.ef_search", "ivfflat": "ivfflat.probes"}
+
+
+def make_corpus(chunks: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Clustered vectors, chunks of the same document sit close together like real embeddings do"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(chunks // 50, 1), dim))
+    vectors = centers[rng.integers(0, len(centers), chunks)] + rng.normal(scale=0.35, size=(chunks, dim))
+    return vectors.astype(np.float32)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, top_k: int) -> list:
+    """Ground truth ids by cosine similarity"""
+    normed = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    scores = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ normed.T
+    best = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    return [set(row.tolist()) for row in best]
+
+
+def load_corpus(conn: psycopg.Connection, corpus: np.ndarray) -> None:
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cur.execute(f"CREATE TABLE {TABLE} (id integer PRIMARY KEY, embedding vector({corpus.shape[1]}))")
+        with cur.copy(f"COPY {TABLE} (id, embedding) FROM STDIN WITH (FORMAT BINARY)") as copy:
+            copy.set_types(["int4", "vector"])
+            for i, vector in enumerate(corpus):
+                copy.write_row((i, vector))
+    conn.commit()
+
+
+def build_index(conn: psycopg.Connection, kind: str, params: dict) -> float:
+    options = ", ".join(f"{name} = {value}" for name, value in params.items())
+    with conn.cursor() as cur:
+        cur.execute(f"DROP INDEX IF EXISTS {TABLE}_ann_idx")
+        start = time.perf_counter()
+        cur.execute(f"CREATE INDEX {TABLE}_ann_idx ON {TABLE} USING {kind} (embedding vector_cosine_ops) "
+                    f"WITH ({options})")
+        elapsed = time.perf_counter() - start
+        cur.execute(f"ANALYZE {TABLE}")
+    conn.commit()
+    return elapsed
+
+
+def measure(conn: psycopg.Connection, queries: np.ndarray, truth: list, top_k: int, knob: str = "",
+            value: int = 0) -> tuple:
+    times, recalls = [], []
+    with conn.cursor() as cur:
+        if knob:
+            # same per-transaction setting search() uses
+            cur.execute("SELECT set_config(%s, %s, true)", (knob, str(value)))
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            cur.execute(f"SELECT id FROM {TABLE} ORDER BY embedding <=> %s LIMIT %s", (query, top_k))
+            found = {row[0] for row in cur.fetchall()}
+            times.append((time.perf_counter() - start) * 1000)
+            recalls.append(len(found & expected) / top_k)
+    conn.commit()
+    times.sort()
+    return statistics.mean(recalls), statistics.median(times), times[max(int(len(times) * 0.99) - 1, 0)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="pgvector ANN index recall / latency benchmark")
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)  # all-MiniLM-L6-v2
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--dsn", help="defaults to COCOINDEX_DATABASE_URL")
+    parser.add_argument("--keep", action="store_true", help="leave the scratch table in place")
+    args = parser.parse_args()
+
+    load_dotenv()
+    corpus = make_corpus(args.chunks, args.dim)
+    # queries are perturbed corpus points so they land inside clusters, like real queries do
+    rng = np.random.default_rng(1)
+    queries = corpus[rng.integers(0, args.chunks, args.queries)] + rng.normal(scale=0.2, size=(args.queries, args.dim))
+    queries = queries.astype(np.float32)
+    truth = exact_top_k(corpus, queries, args.top_k)
+
+    with psycopg.connect(args.dsn or os.getenv("COCOINDEX_DATABASE_URL")) as conn:
+        register_vector(conn)
+        start = time.perf_counter()
+        load_corpus(conn, corpus)
+        print(f"{args.chunks} chunks x {args.dim} dims loaded in {time.perf_counter() - start:.1f}s, "
+              f"{args.queries} queries, recall@{args.top_k} against exact search")
+
+        # exact scan for reference: no index
+        with conn.cursor() as cur:
+            cur.execute(f"DROP INDEX IF EXISTS {TABLE}_ann_idx")
+        conn.commit()
+        recall, p50, p99 = measure(conn, queries, truth, args.top_k)
+        print(f"{'index':<34}{'knob':>16}{'recall':>9}{'p50 ms':>9}{'p99 ms':>9}")
+        print("-" * 77)
+        print(f"{'none (exact scan)':<34}{'-':>16}{recall:>9.3f}{p50:>9.2f}{p99:>9.2f}")
+
+        for kind, params, values in INDEX_CONFIGS:
+            build_time = build_index(conn, kind, params)
+            label = f"{kind} {' '.join(f'{k}={v}' for k, v in params.items())} ({build_time:.1f}s)"
+            for value in values:
+                recall, p50, p99 = measure(conn, queries, truth, args.top_k, KNOB[kind], value)
+                setting = f"{KNOB[kind].split('.')[1]}={value}"
+                print(f"{label:<34}{setting:>16}{recall:>9.3f}{p50:>9.2f}{p99:>9.2f}")
+                label = ""
+
+        if not args.keep:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE {TABLE}")
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
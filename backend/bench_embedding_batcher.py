@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import time
+import numpy as np
+from embedding_batcher import EmbeddingBatcher
+
+# benchmark: queries/sec through EmbeddingBatcher at different concurrency levels, batched vs one query per call
+# the default encode simulates a model with a fixed cost per forward pass plus a small cost per text,
+# --model uses the real sentence-transformers model instead
+# usage: python bench_embedding_batcher.py --queries 2000 --model
+
+
+def simulated_encode(texts: list) -> list:
+    time.sleep(0.008 + 0.0003 * len(texts))
+    return [np.zeros(384, dtype=np.float32) for _ in texts]
+
+
+async def throughput(encode, concurrency: int, queries: int, max_batch: int) -> float:
+    batcher = EmbeddingBatcher(encode, max_batch=max_batch, max_wait=0.005)
+    batcher.start()
+    counter = iter(range(queries))
+
+    async def client():
+        # every query is different, so nothing comes from a cache
+        for i in counter:
+            await batcher.embed(f"how do I fix my squat form {i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await batcher.stop()
+    return queries / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="embedding micro-batching benchmark")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--model", action="store_true", help="encode with all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    encode = simulated_encode
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+        from embedd_data import EMBEDDING_MODEL
+
+        model = SentenceTransformer(EMBEDDING_MODEL)
+        encode = lambda texts: list(model.encode(texts, convert_to_numpy=True))
+
+    print(f"{'concurrency':>12}{'unbatched q/s':>16}{'batched q/s':>14}")
+    print("-" * 42)
+    for concurrency in (1, 4, 16, 64):
+        single = asyncio.run(throughput(encode, concurrency, args.queries, max_batch=1))
+        batched = asyncio.run(throughput(encode, concurrency, args.queries, max_batch=32))
+        print(f"{concurrency:>12}{single:>16.0f}{batched:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
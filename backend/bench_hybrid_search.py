@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import statistics
+import time
+import cocoindex
+from dotenv import load_dotenv
+from psycopg_pool import ConnectionPool
+import embedd_data
+
+# benchmark: vector vs hybrid (vector + full-text, rank fused) search on a fixed query set
+# latency always, relevance (recall@k, MRR) when --qrels points at a JSON file {"query": ["relevant file", ...]}
+# needs the indexed code_embeddings table and COCOINDEX_DATABASE_URL
+# usage: python bench_hybrid_search.py --qrels qrels.json --top-k 5
+
+# exact names and cue words are where plain embeddings miss
+DEFAULT_QUERIES = [
+    "RDL hip hinge",
+    "knee valgus on squats",
+    "bench press bar path",
+    "deadlift lockout",
+    "overhead press elbow position",
+    "pullup scapular retraction",
+    "how deep should I squat",
+    "lower back rounding",
+]
+
+
+def relevance(results: list, relevant: set) -> tuple:
+    """(recall, reciprocal rank) of one result list against the relevant filenames"""
+    found = [r["filename"] for r in results]
+    recall = len(relevant.intersection(found)) / len(relevant) if relevant else 0.0
+    rank = next((i + 1 for i, name in enumerate(found) if name in relevant), None)
+    return recall, 1 / rank if rank else 0.0
+
+
+def run(pool: ConnectionPool, search_fn, qrels: dict, top_k: int, repeat: int) -> dict:
+    times, recalls, reciprocal_ranks = [], [], []
+    for query, relevant in qrels.items():
+        search_fn(pool, query, top_k)  # warm the query embedding cache, only SQL time is compared
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = search_fn(pool, query, top_k)
+            times.append((time.perf_counter() - start) * 1000)
+        if relevant:
+            recall, rr = relevance(results, set(relevant))
+            recalls.append(recall)
+            reciprocal_ranks.append(rr)
+    times.sort()
+    return {
+        "p50": statistics.median(times),
+        "p99": times[max(int(len(times) * 0.99) - 1, 0)],
+        "recall": statistics.mean(recalls) if recalls else None,
+        "mrr": statistics.mean(reciprocal_ranks) if reciprocal_ranks else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="vector vs hybrid search benchmark")
+    parser.add_argument("--qrels", help="JSON file mapping each query to its relevant filenames")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    load_dotenv()
+    cocoindex.init()
+    if args.qrels:
+        with open(args.qrels, encoding="utf-8") as f:
+            qrels = json.load(f)
+    else:
+        qrels = {query: [] for query in DEFAULT_QUERIES}
+
+    pool = ConnectionPool(os.getenv("COCOINDEX_DATABASE_URL"))
+    embedd_data.ensure_fulltext_index(pool)
+
+    modes = {
+        "vector": lambda p, q, k: embedd_data.search_by_vector(p, embedd_data.embed_query(q), k),
+        "hybrid": embedd_data.hybrid_search,
+    }
+    print(f"{len(qrels)} queries, top {args.top_k}, {args.repeat} runs each")
+    print(f"{'mode':<8}{'p50 ms':>10}{'p99 ms':>10}{'recall@k':>10}{'MRR':>8}")
+    print("-" * 46)
+    for name, search_fn in modes.items():
+        stats = run(pool, search_fn, qrels, args.top_k, args.repeat)
+        recall = f"{stats['recall']:.3f}" if stats["recall"] is not None else "-"
+        mrr = f"{stats['mrr']:.3f}" if stats["mrr"] is not None else "-"
+        print(f"{name:<8}{stats['p50']:>10.2f}{stats['p99']:>10.2f}{recall:>10}{mrr:>8}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# benchmark: import time of each backend entry point, measured with python -X importtime in a fresh process
+# exits with 1 when an entry point goes over its budget or pulls in a module it should load lazily
+# usage: python bench_import_time.py --runs 5
+
+# budget in ms per entry point (cumulative import time of the module itself), with headroom over the
+# measured median so a noisy machine doesn't fail it
+IMPORT_BUDGETS_MS = {
+    "agents": 150,
+    "workout_store": 50,
+    "training_load": 30,
+    "embedd_data": 900,
+}
+
+# heavy modules each entry point must not import until they are used
+DEFERRED_MODULES = {
+    "agents": ["numpy", "openai", "matplotlib", "dotenv", "lmstudio"],
+    "workout_store": ["numpy"],
+    "training_load": ["numpy"],
+    "embedd_data": ["nltk", "sentence_transformers", "torch"],
+}
+
+
+def measure(module: str) -> tuple:
+    """Import module in a fresh interpreter, returns (cumulative ms, deferred modules that got loaded anyway)"""
+    check = f"import sys, {module}; print(','.join(m for m in {DEFERRED_MODULES[module]!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", check], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module and not parts[2].startswith("  "):
+            cumulative_us = int(parts[1])
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative_us / 1000, loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="backend import time benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'entry point':<16}{'median':>10}{'budget':>10}  deferred modules loaded")
+    print("-" * 60)
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        try:
+            runs = [measure(module) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<16}{'import failed':>20}  {e.stderr.strip().splitlines()[-1]}")
+            failed = True
+            continue
+
+        median = statistics.median(ms for ms, _ in runs)
+        loaded = sorted({m for _, found in runs for m in found})
+        over = median > budget or loaded
+        failed = failed or bool(over)
+        print(f"{module:<16}{median:>8.1f}ms{budget:>8}ms  {', '.join(loaded) or '-'}{'  OVER BUDGET' if over else ''}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import random
+import time
+from text_normalize import normalize_text, tokenize
+
+# benchmark: chunk normalization throughput and how many tokens it removes before embedding
+# --embed also times the embedding model on raw vs normalized chunks (needs sentence-transformers)
+# usage: python bench_normalize.py --chunks 5000 --embed
+
+WORDS = ["the", "squat", "is", "a", "compound", "movement", "that", "trains", "your", "quads", "and", "glutes",
+         "keep", "chest", "up", "brace", "core", "before", "you", "descend", "to", "depth", "with", "knees", "out"]
+MARKUP = ["<p>", "</p>", "<b>", "</b>", "<br/>", '<img src="squat.png" alt="squat">', "<!-- form cue -->"]
+
+
+def make_chunks(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        parts = []
+        while sum(len(p) + 1 for p in parts) < 900:  # about the flow's chunk_size
+            parts.append(rng.choice(MARKUP) if rng.random() < 0.1 else rng.choice(WORDS).title())
+            if rng.random() < 0.1:
+                parts.append("\n\n   ")
+        chunks.append(" ".join(parts))
+    return chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="text normalization benchmark")
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--embed", action="store_true", help="time the embedding model too")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    variants = {
+        "raw": chunks,
+        "normalized": None,
+        "normalized + stopwords": None,
+    }
+
+    print(f"{'variant':<24}{'chunks/sec':>12}{'MB/sec':>10}{'tokens':>12}")
+    print("-" * 58)
+    raw_bytes = sum(len(c.encode("utf-8")) for c in chunks)
+    for name, remove_stopwords in (("normalized", False), ("normalized + stopwords", True)):
+        start = time.perf_counter()
+        variants[name] = [normalize_text(c, ".md", remove_stopwords=remove_stopwords) for c in chunks]
+        elapsed = time.perf_counter() - start
+        tokens = sum(len(tokenize(c)) for c in variants[name])
+        print(f"{name:<24}{len(chunks) / elapsed:>12.0f}{raw_bytes / elapsed / 1e6:>10.1f}{tokens:>12}")
+    print(f"{'raw':<24}{'-':>12}{'-':>10}{sum(len(tokenize(c)) for c in chunks):>12}")
+
+    if args.embed:
+        from sentence_transformers import SentenceTransformer
+        from embedd_data import EMBEDDING_MODEL
+
+        model = SentenceTransformer(EMBEDDING_MODEL)
+        model.encode(chunks[:32])  # warm up
+        print("-" * 58)
+        for name, texts in variants.items():
+            # what the model actually sees after its own (sub)word tokenizer
+            model_tokens = sum(len(ids) for ids in model.tokenizer(texts)["input_ids"])
+            start = time.perf_counter()
+            model.encode(texts, batch_size=64)
+            elapsed = time.perf_counter() - start
+            print(f"embed {name:<22} {len(texts) / elapsed:>8.1f} chunks/sec  {model_tokens} model tokens")
+
+
+if __name__ == "__main__":
+    main()
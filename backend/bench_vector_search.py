@@ -0,0 +1,88 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import numpy as np
+from local_vector_index import LocalVectorIndex
+
+# benchmark: top-k search latency of the local numpy index vs pgvector on the same synthetic corpus
+# the pgvector side loads a temp table and needs COCOINDEX_DATABASE_URL, it is skipped without it
+# usage: python bench_vector_search.py --chunks 20000 --queries 200
+
+
+def make_corpus(chunks: int, dim: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(chunks, dim)).astype(np.float32)
+    return [(f"form_{i // 20}.md", f"chunk {i}", vectors[i], {"line": i}, {"line": i + 1}) for i in range(chunks)]
+
+
+def latency(fn, queries: list) -> tuple:
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99) - 1]
+
+
+def bench_pgvector(rows: list, queries: list, top_k: int) -> tuple:
+    import psycopg
+    from pgvector.psycopg import register_vector
+
+    dim = len(rows[0][2])
+    with psycopg.connect(os.getenv("COCOINDEX_DATABASE_URL")) as conn:
+        register_vector(conn)
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE TEMP TABLE bench_embeddings (filename text, code text, embedding vector({dim}), "
+                        "start jsonb, \"end\" jsonb)")
+            with cur.copy("COPY bench_embeddings (filename, code, embedding) FROM STDIN") as copy:
+                copy.set_types(["text", "text", "vector"])
+                for row in rows:
+                    copy.write_row(row[:3])
+
+            def query(vector):
+                cur.execute('SELECT filename, code, embedding <=> %s AS distance, start, "end" '
+                            "FROM bench_embeddings ORDER BY distance LIMIT %s", (vector, top_k))
+                return cur.fetchall()
+
+            return latency(query, queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="local vector index vs pgvector benchmark")
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_corpus(args.chunks, args.dim)
+    queries = list(np.random.default_rng(1).normal(size=(args.queries, args.dim)).astype(np.float32))
+
+    print(f"{args.chunks} chunks x {args.dim} dims, {args.queries} queries, top {args.top_k}")
+    print("-" * 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        index = LocalVectorIndex(tmp)
+        index.build(rows)
+        print(f"local build            {time.perf_counter() - start:8.2f} s")
+
+        p50, p99 = latency(lambda q: index.search(q, args.top_k), queries)
+        print(f"local search           p50 {p50:7.3f} ms   p99 {p99:7.3f} ms")
+
+        start = time.perf_counter()
+        index.search_many(queries, args.top_k)
+        print(f"local search_many      {(time.perf_counter() - start) * 1000 / len(queries):7.3f} ms per query")
+
+    if os.getenv("COCOINDEX_DATABASE_URL"):
+        # exact scan like the local index, no ANN index on the temp table
+        p50, p99 = bench_pgvector(rows, queries, args.top_k)
+        print(f"pgvector search        p50 {p50:7.3f} ms   p99 {p99:7.3f} ms")
+    else:
+        print("pgvector search        skipped, COCOINDEX_DATABASE_URL not set")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import gc
+import random
+import tracemalloc
+from workout_model import Workout, WorkoutLog
+
+# memory used to hold N exercise entries as legacy dicts, Workout objects and a WorkoutLog
+# usage: python bench_workout_memory.py --entries 100000
+
+EXERCISES = ["back squat", "bench press", "deadlift", "barbell row", "overhead press",
+             "bicep curl", "pullup", "dips", "leg press", "plank", "calf raise", "lunge"]
+
+
+def make_legacy(entries: int, per_workout: int = 5, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    workouts = []
+    for i in range(entries // per_workout):
+        # names come from input() in the app, so every workout gets its own string objects
+        exercises = {"".join(list(name)): (rng.randint(2, 5), rng.randint(3, 12), float(rng.randrange(45, 405, 5)),
+                                           rng.randint(5, 10))
+                     for name in rng.sample(EXERCISES, per_workout)}
+        workouts.append({
+            f"workout_{i}": exercises,
+            "time": rng.randint(30, 90),
+            "muscles_targeted": ", ".join(sorted(rng.sample(["back", "biceps", "chest", "core", "quads"], 3))),
+            "date": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "exercise_count": per_workout
+        })
+    return workouts
+
+
+def measure(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="workout representation memory benchmark")
+    parser.add_argument("--entries", type=int, default=100_000)
+    args = parser.parse_args()
+
+    legacy, legacy_size = measure(lambda: make_legacy(args.entries))
+    typed, typed_size = measure(lambda: [Workout.from_legacy(w) for w in legacy])
+    log, log_size = measure(lambda: WorkoutLog(typed))
+
+    print(f"{log.entry_count} exercise entries in {len(log)} workouts")
+    print("-" * 50)
+    for name, size in [("legacy dicts", legacy_size), ("Workout objects", typed_size), ("WorkoutLog", log_size)]:
+        print(f"{name:<18} {size / 1024 / 1024:8.2f} MB  {size / log.entry_count:7.1f} bytes/entry")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+from workout_store import WorkoutStore
+
+# benchmark: bulk load years of daily workouts, then time date range queries
+# usage: python bench_workout_store.py --years 10
+
+EXERCISES = ["back squat", "bench press", "deadlift", "barbell row", "overhead press", "bicep curl", "pullup"]
+
+
+def make_history(years: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    day = datetime.date.today() - datetime.timedelta(days=365 * years)
+    workouts = []
+    for _ in range(365 * years):
+        exercises = {name: (rng.randint(2, 5), rng.randint(3, 12), float(rng.randrange(45, 405, 5)), rng.randint(5, 10))
+                     for name in rng.sample(EXERCISES, 5)}
+        workouts.append({
+            f"workout_{day:%Y%m%d}_1800": exercises,
+            "time": rng.randint(30, 90),
+            "muscles_targeted": "back, biceps, chest, quads",
+            "date": day.strftime("%Y-%m-%d"),
+            "exercise_count": len(exercises)
+        })
+        day += datetime.timedelta(days=1)
+    return workouts
+
+
+def timed(fn, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="workout history store benchmark")
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    workouts = make_history(args.years)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = WorkoutStore(os.path.join(tmp, "history.db"))
+
+        start = time.perf_counter()
+        store.add_workouts(workouts)
+        load = time.perf_counter() - start
+
+        today = datetime.date.today()
+        week_ago = today - datetime.timedelta(days=7)
+        month_ago = today - datetime.timedelta(days=28)
+        year_ago = today - datetime.timedelta(days=365)
+
+        print(f"{len(workouts)} workouts loaded in {load:.2f}s ({len(workouts) / load:.0f} workouts/sec)")
+        print("-" * 50)
+        print(f"workouts, last 7 days      {timed(lambda: store.workouts_between(week_ago, today)):7.3f} ms")
+        print(f"workouts, last 28 days     {timed(lambda: store.workouts_between(month_ago, today)):7.3f} ms")
+        print(f"one exercise, last year    {timed(lambda: store.exercise_history('back squat', year_ago, today)):7.3f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
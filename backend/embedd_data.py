@@ -1,57 +1,147 @@
 # cocoindex pipeline
+import datetime
+import functools
 import re
-from dotenv import load_dotenv
+import threading
+import psycopg
 from psycopg_pool import ConnectionPool
 from pgvector.psycopg import register_vector
-from typing import Any
+from typing import Any, Literal
 import cocoindex
 import os
 from numpy.typing import NDArray
 import numpy as np
 import time
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from embedding_cache import EmbeddingCache
+from local_vector_index import LocalVectorIndex
+from results_log import get_results_log
+from text_normalize import ENGLISH_STOPWORDS, normalize_text, tokenize
 
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# query vectors, created on first search (after load_dotenv)
+# QUERY_CACHE_SIZE sets how many are kept in memory, QUERY_CACHE_PATH keeps them in a sqlite file across restarts
+_query_cache = None
 
-# Pre-load stopwords to avoid threading issues
-ENGLISH_STOPWORDS = set(stopwords.words('english'))
+# chunk vectors by (model, normalized chunk text), shared by all files and kept across runs in CHUNK_CACHE_PATH
+# (default .chunk_embeddings.db), CHUNK_CACHE_SIZE is how many stay in memory, CHUNK_CACHE_DISK_MAX in the file
+_chunk_cache = None
 
+# in-process copy of code_embeddings used when SEARCH_BACKEND=local, kept under LOCAL_INDEX_PATH
+_local_index = None
 
-# cocoindex indexing flow
-@cocoindex.op.function()
-def extract_extension(filename: str) -> str:
-    return os.path.splitext(filename)[1]  # get the extension only
+# hybrid search: reciprocal rank fusion constant (the usual 60, so no single list's top hit dominates) and how
+# many candidates each side contributes before fusing
+RRF_K = 60
+HYBRID_CANDIDATES = 50
+WORD_RE = re.compile(r"\w+")
+
+
+def stopword_filter() -> bool:
+    # STOPWORD_FILTER=1 drops English stopwords from chunks and queries before embedding (re-index after changing it)
+    return os.getenv("STOPWORD_FILTER", "0") == "1"
+
+
+def source_dir() -> str:
+    # WORKOUT_FORMS_DIR is the directory the flow indexes
+    return os.getenv("WORKOUT_FORMS_DIR", "workout_forms")
+
+
+def refresh_interval() -> datetime.timedelta:
+    # how often live mode rescans the source directory, COCO_REFRESH_SECONDS (default 10)
+    return datetime.timedelta(seconds=float(os.getenv("COCO_REFRESH_SECONDS", "10")))
+
+
+def _env_int(name: str) -> int | None:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+# pgvector's hnsw.ef_search when nothing sets it
+HNSW_DEFAULT_EF_SEARCH = 40
+
+
+def vector_index_method() -> cocoindex.HnswVectorIndexMethod | cocoindex.IvfFlatVectorIndexMethod:
+    """
+    ANN index built on the embedding column, VECTOR_INDEX=hnsw (default) or ivfflat
+    HNSW_M / HNSW_EF_CONSTRUCTION and IVFFLAT_LISTS set the build parameters, unset ones keep pgvector's defaults
+    (see bench_ann_index.py for the recall / latency trade-off)
+    """
+    kind = os.getenv("VECTOR_INDEX", "hnsw")
+    if kind == "hnsw":
+        return cocoindex.HnswVectorIndexMethod(m=_env_int("HNSW_M"), ef_construction=_env_int("HNSW_EF_CONSTRUCTION"))
+    if kind == "ivfflat":
+        return cocoindex.IvfFlatVectorIndexMethod(lists=_env_int("IVFFLAT_LISTS"))
+    raise ValueError(f"VECTOR_INDEX must be 'hnsw' or 'ivfflat', got '{kind}'")
+
+
+class IndexingActivity:
+    """
+    Counts the work the flow's ops do between two reports
+    cocoindex only runs them for new or changed files, so this is what an update actually re-processed
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.files = 0
+        self.chunks = 0
+        self.started: float | None = None
+
+    def _mark(self, files: int = 0, chunks: int = 0) -> None:
+        with self._lock:
+            if self.started is None:
+                self.started = time.perf_counter()
+            self.files += files
+            self.chunks += chunks
+
+    def file_processed(self) -> None:
+        self._mark(files=1)
 
+    def chunk_processed(self) -> None:
+        self._mark(chunks=1)
 
-def remove_html_tags(text: str) -> str:
-    return re.sub(r"<.*?>", "", text)
+    def take(self) -> dict[str, Any]:
+        """Counts since the last take, elapsed is measured from the first op call of this update"""
+        with self._lock:
+            elapsed = time.perf_counter() - self.started if self.started is not None else 0.0
+            stats = {"files": self.files, "chunks": self.chunks, "elapsed": round(elapsed, 3)}
+            self.reset()
+            return stats
 
 
-# @cocoindex.op.function()
-# def remove_whitespace(text: str) -> str:
-#     return text.strip().replace(" ", "")
+indexing_activity = IndexingActivity()
 
 
-def convert_to_lower(text: str) -> str:
-    return text.lower()
+# cocoindex indexing flow
+@cocoindex.op.function()
+def extract_extension(filename: str) -> str:
+    indexing_activity.file_processed()  # runs once per new or changed file
+    return os.path.splitext(filename)[1]  # get the extension only
 
 
-@cocoindex.transform_flow()
-def code_to_embedding(text: cocoindex.DataSlice[str]) -> cocoindex.DataSlice[NDArray[np.float32]]:
-    return text.transform(
-        cocoindex.functions.SentenceTransformerEmbed(
-            model="sentence-transformers/all-MiniLM-L6-v2"
-        ))
+@cocoindex.op.function()
+def normalize_chunk(text: str, language: str) -> str:
+    """Strip HTML (markup files), lowercase and collapse whitespace before a chunk is embedded"""
+    indexing_activity.chunk_processed()
+    return normalize_text(text, language, remove_stopwords=stopword_filter())
+
+
+@cocoindex.op.function()
+def embed_chunk(text: str) -> cocoindex.Vector[np.float32, Literal[EMBEDDING_DIM]]:
+    """
+    all-MiniLM-L6-v2 embedding of a chunk, looked up in the chunk cache first
+    An edit shifts the chunk boundaries of the whole file, most chunk texts still exist somewhere already
+    """
+    cache = get_chunk_cache()
+    vector = cache.get(text)
+    if vector is None:
+        vector = _embedding_model().encode(text, convert_to_numpy=True)
+        cache.put(text, vector)
+    return vector
 
 
 @cocoindex.flow_def(name="CodeEmbedding")
@@ -59,10 +149,12 @@ def code_embedding_flow(flow_builder: cocoindex.FlowBuilder, data_scope: cocoind
     """
     Define an example flow that embeds files into database
     """
+    # refresh_interval only matters in live mode, update() does a single pass
     data_scope["files"] = flow_builder.add_source(
-        cocoindex.sources.LocalFile(path="workout_forms",
+        cocoindex.sources.LocalFile(path=source_dir(),
                                     included_patterns=["*.py", "*.rs", "*.toml", "*.md", "*.json"],
-                                    excluded_patterns=[".*", "target", "**/node_modules"]))
+                                    excluded_patterns=[".*", "target", "**/node_modules"]),
+        refresh_interval=refresh_interval())
 
     code_embeddings = data_scope.add_collector()
 
@@ -75,7 +167,9 @@ def code_embedding_flow(flow_builder: cocoindex.FlowBuilder, data_scope: cocoind
             chunk_overlap=300)
 
         with file["chunks"].row() as chunk:
-            chunk["embedding"] = chunk["text"].call(code_to_embedding)
+            # the normalized text is only embedded, the original chunk is what gets stored and shown
+            chunk["normalized"] = chunk["text"].transform(normalize_chunk, language=file["extension"])
+            chunk["embedding"] = chunk["normalized"].transform(embed_chunk)
             code_embeddings.collect(filename=file["filename"], location=chunk["location"],
                                     code=chunk["text"], embedding=chunk["embedding"],
                                     start=chunk["start"], end=chunk["end"])
@@ -88,67 +182,345 @@ def code_embedding_flow(flow_builder: cocoindex.FlowBuilder, data_scope: cocoind
             cocoindex.VectorIndexDef(
                 field_name="embedding",
                 metric=cocoindex.VectorSimilarityMetric.COSINE_SIMILARITY,
+                method=vector_index_method(),
             )
         ],
     )
 
 
-def search(pool: ConnectionPool, query: str, top_k=5) -> list[dict[str, Any]]:
-    table_name = cocoindex.utils.get_target_default_name(code_embedding_flow,
-                                                         "code_embeddings")
+@functools.cache
+def code_embeddings_table() -> str:
+    # fixed for the lifetime of the flow, no need to resolve it on every search
+    return cocoindex.utils.get_target_default_name(code_embedding_flow, "code_embeddings")
+
+
+def get_chunk_cache() -> EmbeddingCache:
+    global _chunk_cache
+
+    if _chunk_cache is None:
+        _chunk_cache = EmbeddingCache(EMBEDDING_MODEL,
+                                      max_size=int(os.getenv("CHUNK_CACHE_SIZE", "20000")),
+                                      path=os.getenv("CHUNK_CACHE_PATH", ".chunk_embeddings.db"),
+                                      max_disk_entries=int(os.getenv("CHUNK_CACHE_DISK_MAX", "200000")))
+    return _chunk_cache
+
+
+def take_chunk_cache_stats() -> dict[str, float]:
+    """Chunk cache hits / misses since the last call, i.e. for one update. Also commits that update's vectors"""
+    cache = get_chunk_cache()
+    cache.flush()
+    stats = cache.stats()
+    cache.reset_stats()
+    return stats
+
+
+def update_index() -> None:
+    """One update() pass, prints the engine stats and how many chunk embeddings came from the cache"""
+    stats = code_embedding_flow.update()
+    print(f"Updated Index: {stats}")
+    cache = take_chunk_cache_stats()
+    print(f"chunk embeddings: {cache['misses']} computed, {cache['hits']} cached (hit rate {cache['hit_rate']:.1%})")
+
+
+def get_query_cache() -> EmbeddingCache:
+    global _query_cache
+
+    if _query_cache is None:
+        _query_cache = EmbeddingCache(EMBEDDING_MODEL,
+                                      max_size=int(os.getenv("QUERY_CACHE_SIZE", "1024")),
+                                      path=os.getenv("QUERY_CACHE_PATH") or None)
+    return _query_cache
+
+
+def normalize_query(query: str) -> str:
+    # same normalization as the indexed chunks, which also makes "Squat  Form" and "squat form" one cache entry
+    return normalize_text(query, remove_stopwords=stopword_filter())
+
+
+def embed_query(query: str) -> NDArray[np.float32]:
+    """Embedding for a search query, repeated queries skip the model"""
+    query = normalize_query(query)
+    cache = get_query_cache()
+    query_vector = cache.get(query)
+    if query_vector is None:
+        query_vector = _embedding_model().encode(query, convert_to_numpy=True)
+        cache.put(query, query_vector)
+    return query_vector
 
-    # define the query_vector (embedded query) - this will also be normalized
-    query_vector = code_to_embedding.eval(query)
+
+_model_lock = threading.Lock()
+
+
+@functools.cache
+def _load_embedding_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+def _embedding_model():
+    # the one copy of the model in the process, used for query embeddings (single and batched) and for chunks
+    # missing from the chunk cache. The lock keeps concurrent indexing threads from loading it twice
+    with _model_lock:
+        return _load_embedding_model()
+
+
+def embed_queries(queries: list[str]) -> list[NDArray[np.float32]]:
+    """Embeddings for several queries, everything not cached goes through the model in one batch"""
+    normalized = [normalize_query(query) for query in queries]
+    cache = get_query_cache()
+    vectors = [cache.get(query) for query in normalized]
+
+    missing = list(dict.fromkeys(query for query, vector in zip(normalized, vectors) if vector is None))
+    if missing:
+        encoded = dict(zip(missing, _embedding_model().encode(missing, convert_to_numpy=True)))
+        cache.put_many(encoded.items())
+        vectors = [vector if vector is not None else encoded[query] for query, vector in zip(normalized, vectors)]
+
+    return vectors
+
+
+def _result_row(row) -> dict[str, Any]:
+    return {
+        "filename": row[0],
+        "code": row[1],
+        "score": 1.0 - row[2],
+        "start": row[3],
+        "end": row[4]
+    }
+
+
+def search_backend() -> str:
+    # SEARCH_BACKEND=pgvector (default) queries postgres, local searches an in-process copy of the table
+    backend = os.getenv("SEARCH_BACKEND", "pgvector")
+    if backend not in ("pgvector", "local"):
+        raise ValueError(f"SEARCH_BACKEND must be 'pgvector' or 'local', got '{backend}'")
+    return backend
+
+
+def get_local_index(pool: ConnectionPool | None = None) -> LocalVectorIndex:
+    """
+    Local index, loaded from disk and synced with the code_embeddings table on first use
+    Without a pool (no postgres at the edge) whatever was last written to LOCAL_INDEX_PATH is served
+    """
+    global _local_index
+
+    if _local_index is None:
+        _local_index = LocalVectorIndex(os.getenv("LOCAL_INDEX_PATH", ".vector_index"))
+        if pool is not None:
+            _local_index.sync(pool, code_embeddings_table())
+    return _local_index
+
+
+def _apply_ann_settings(cur, top_k: int, ef_search: int | None, probes: int | None) -> None:
+    """
+    Per-query ANN knobs, falling back to HNSW_EF_SEARCH / IVFFLAT_PROBES. set_config(..., true) only lasts for
+    the current transaction, so pooled connections go back to the server defaults
+    """
+    ef_search = ef_search or _env_int("HNSW_EF_SEARCH")
+    probes = probes or _env_int("IVFFLAT_PROBES")
+    if os.getenv("VECTOR_INDEX", "hnsw") == "hnsw":
+        # hnsw returns at most ef_search rows, below top_k the LIMIT couldn't be filled, so the value is always
+        # set, even without a knob pgvector's default would cap every search at HNSW_DEFAULT_EF_SEARCH rows
+        cur.execute("SELECT set_config('hnsw.ef_search', %s, true)",
+                    (str(max(ef_search or HNSW_DEFAULT_EF_SEARCH, top_k)),))
+    if probes:
+        cur.execute("SELECT set_config('ivfflat.probes', %s, true)", (str(probes),))
+
+
+def search_mode() -> str:
+    # SEARCH_MODE=vector (default) ranks by cosine distance only, hybrid fuses it with full-text matches on code
+    # (pgvector backend only, the local index is vector only)
+    mode = os.getenv("SEARCH_MODE", "vector")
+    if mode not in ("vector", "hybrid"):
+        raise ValueError(f"SEARCH_MODE must be 'vector' or 'hybrid', got '{mode}'")
+    return mode
+
+
+def lexical_query(query: str) -> str:
+    """tsquery text for the full-text side: the query's words without stopwords, any of them may match"""
+    words = [token for token in tokenize(normalize_text(query))
+             if WORD_RE.fullmatch(token) and token not in ENGLISH_STOPWORDS]
+    return " | ".join(dict.fromkeys(words))
+
+
+def ensure_fulltext_index(pool: ConnectionPool) -> None:
+    """
+    GIN index over the chunk text for hybrid search. cocoindex owns the table, so the index is added on top
+    'simple' config: no stemming or stopword list of its own, exact names like "rdl" stay searchable
+    Built CONCURRENTLY so the indexer keeps writing meanwhile, run it at startup (setup_search), not per query
+    """
+    table_name = code_embeddings_table()
+    index_name = f"{table_name}_code_fts_idx"
+    # CONCURRENTLY can't run inside a transaction block, so this gets its own autocommit connection
+    with psycopg.connect(pool.conninfo, autocommit=True) as conn:
+        # an interrupted concurrent build leaves an invalid index behind, which IF NOT EXISTS would keep
+        invalid = conn.execute("SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(%s) AND NOT indisvalid",
+                               (index_name,)).fetchone()
+        if invalid:
+            conn.execute(f"DROP INDEX CONCURRENTLY {index_name}")
+        conn.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                     f"ON {table_name} USING GIN (to_tsvector('simple', code))")
+
+
+def setup_search(pool: ConnectionPool) -> None:
+    """Create the flow's tables if they are missing and, for SEARCH_MODE=hybrid, the full-text index on top"""
+    code_embedding_flow.setup()
+    if search_mode() == "hybrid":
+        ensure_fulltext_index(pool)
+
+
+def hybrid_search(pool: ConnectionPool, query: str, top_k=5, ef_search: int | None = None,
+                  probes: int | None = None,
+                  query_vector: NDArray[np.float32] | None = None) -> list[dict[str, Any]]:
+    """
+    Vector and full-text rankings fused with reciprocal rank fusion, in one round trip
+    Results have the search() fields plus rrf_score, which is what they are ordered by
+    """
+    terms = lexical_query(query)
+    if query_vector is None:
+        query_vector = embed_query(query)
+    if not terms:
+        return search_by_vector(pool, query_vector, top_k, ef_search, probes)  # only stopwords, no text side
+
+    table_name = code_embeddings_table()
+    with pool.connection() as conn:
+        register_vector(conn)
+        with conn.cursor() as cur:
+            _apply_ann_settings(cur, max(HYBRID_CANDIDATES, top_k), ef_search, probes)
+            # each side ranks its own candidates, a chunk scores sum(1 / (RRF_K + rank)) over the lists it is in
+            cur.execute(
+                f"""
+                WITH vec AS (
+                    SELECT filename, location, row_number() OVER (ORDER BY distance) AS rank
+                    FROM (
+                        SELECT filename, location, embedding <=> %(vec)s AS distance
+                        FROM {table_name} ORDER BY distance LIMIT %(candidates)s
+                    ) nearest
+                ), lex AS (
+                    SELECT filename, location, row_number() OVER (ORDER BY text_rank DESC) AS rank
+                    FROM (
+                        SELECT filename, location, ts_rank_cd(to_tsvector('simple', code), q) AS text_rank
+                        FROM {table_name}, to_tsquery('simple', %(terms)s) q
+                        WHERE to_tsvector('simple', code) @@ q
+                        ORDER BY text_rank DESC LIMIT %(candidates)s
+                    ) matches
+                ), fused AS (
+                    SELECT filename, location, sum(1.0 / (%(rrf_k)s + rank)) AS rrf_score
+                    FROM (SELECT * FROM vec UNION ALL SELECT * FROM lex) ranked
+                    GROUP BY filename, location
+                )
+                SELECT t.filename, t.code, t.embedding <=> %(vec)s AS distance, t.start, t."end", f.rrf_score
+                FROM fused f JOIN {table_name} t USING (filename, location)
+                ORDER BY f.rrf_score DESC LIMIT %(top_k)s
+                """,
+                {"vec": query_vector, "terms": terms, "candidates": max(HYBRID_CANDIDATES, top_k),
+                 "rrf_k": RRF_K, "top_k": top_k},
+            )
+            return [{**_result_row(row), "rrf_score": float(row[5])} for row in cur.fetchall()]
+
+
+def search_by_vector(pool: ConnectionPool, query_vector: NDArray[np.float32], top_k=5, ef_search: int | None = None,
+                     probes: int | None = None) -> list[dict[str, Any]]:
+    table_name = code_embeddings_table()
     # run the query to get results
     with pool.connection() as conn:
         register_vector(conn)
         with conn.cursor() as cur:
+            _apply_ann_settings(cur, top_k, ef_search, probes)
             cur.execute(
                 f"""
                 SELECT filename, code, embedding <=> %s AS distance, start, "end"
                 FROM {table_name} ORDER BY distance LIMIT %s
                 """, (query_vector, top_k),
             )
-            return [
-                {
-                    "filename": row[0],
-                    "code": row[1],
-                    "score": 1.0 - row[2],
-                    "start": row[3],
-                    "end": row[4]
-                }
-                for row in cur.fetchall()
-            ]
-
+            return [_result_row(row) for row in cur.fetchall()]
 
-def save_vector_results(results: list[dict[str, Any]], query: str) -> None:
-    try:
-        with open('vector_output.txt', 'w', encoding='utf-8') as f:
-            f.write(f"cocoindex vector search results for query: {query} - {time.strftime('%Y-%m-%d %H:%M:%S')}")
-            f.write("=" * 80 + "\n\n")
 
-            if not results:
-                f.write("No results found!")
-                return
+def search(pool: ConnectionPool | None, query: str, top_k=5, ef_search: int | None = None,
+           probes: int | None = None, query_vector: NDArray[np.float32] | None = None) -> list[dict[str, Any]]:
+    """
+    ef_search (hnsw) / probes (ivfflat) trade recall for latency on this call only, the local index is exact
+    Pass query_vector when the query was already embedded (e.g. in a batch by search_api)
+    """
+    if query_vector is None:
+        # define the query_vector (embedded query) - this will also be normalized
+        query_vector = embed_query(query)
+    if search_backend() == "local":
+        return get_local_index(pool).search(query_vector, top_k)
+    if search_mode() == "hybrid":
+        return hybrid_search(pool, query, top_k, ef_search, probes, query_vector)
+    return search_by_vector(pool, query_vector, top_k, ef_search, probes)
+
+
+def search_many(pool: ConnectionPool | None, queries: list[str], top_k=5, ef_search: int | None = None,
+                probes: int | None = None) -> list[list[dict[str, Any]]]:
+    """
+    Search several queries at once: one batched model call and one SQL round trip
+    Returns one result list per query, in the same order and format as search() (vector ranking only)
+    """
+    if not queries:
+        return []
 
-            for i, result in enumerate(results):
-                f.write(f"Rank {i + 1} - Score: {result['score']: .4f}\n")
-                f.write(f"File: {result['filename']} (L{result['start']['line']}-L{result['end']['line']})\n")
-                f.write(f"Code: \n{result['code']}\n")
-                f.write("-" * 80 + "\n\n")
+    query_vectors = embed_queries(queries)
+    if search_backend() == "local":
+        return get_local_index(pool).search_many(query_vectors, top_k)
 
-            print(f"results added to vector_output.txt")
+    table_name = code_embeddings_table()
 
-    except Exception as e:
-        print(f"error saving results: {e}")
+    results: list[list[dict[str, Any]]] = [[] for _ in queries]
+    with pool.connection() as conn:
+        register_vector(conn)
+        with conn.cursor() as cur:
+            _apply_ann_settings(cur, top_k, ef_search, probes)
+            # top_k nearest chunks for every query vector, idx is the 1-based position in queries
+            cur.execute(
+                f"""
+                SELECT q.idx, r.filename, r.code, r.distance, r.start, r."end"
+                FROM unnest(%s::vector[]) WITH ORDINALITY AS q(vec, idx)
+                CROSS JOIN LATERAL (
+                    SELECT filename, code, embedding <=> q.vec AS distance, start, "end"
+                    FROM {table_name} ORDER BY distance LIMIT %s
+                ) r
+                ORDER BY q.idx, r.distance
+                """, (query_vectors, top_k),
+            )
+            for row in cur.fetchall():
+                results[row[0] - 1].append(_result_row(row[1:]))
 
+    return results
 
-def _main() -> None:
-    stats = code_embedding_flow.update()
-    print(f"Updated Index: {stats}")
 
+def report_live_updates(updater: cocoindex.FlowLiveUpdater, pool: ConnectionPool) -> None:
+    """Print what each live update did until the updater stops, runs on its own thread"""
+    while True:
+        status = updater.next_status_updates()
+        if status.updated_sources:
+            activity = indexing_activity.take()
+            cache = take_chunk_cache_stats()
+            print(f"\n[index] {activity['files']} files re-processed, {activity['chunks']} chunks "
+                  f"({cache['misses']} embedded, {cache['hits']} from cache) in {activity['elapsed']:.2f}s "
+                  f"| {updater.update_stats()}")
+            if search_backend() == "local":
+                get_local_index(pool).sync(pool, code_embeddings_table())
+        if not status.active_sources:
+            return
+
+
+def _main(live: bool = False) -> None:
     # initialize db connection
     pool = ConnectionPool(os.getenv("COCOINDEX_DATABASE_URL"))
+    setup_search(pool)
+
+    updater = None
+    if live:
+        # first pass catches up like update(), afterwards changed files are picked up every refresh interval
+        # and files removed from the directory have their rows deleted
+        updater = cocoindex.FlowLiveUpdater(code_embedding_flow, cocoindex.FlowLiveUpdaterOptions(live_mode=True))
+        updater.start()
+        threading.Thread(target=report_live_updates, args=(updater, pool), name="index-stats", daemon=True).start()
+        print(f"Live indexing {source_dir()} every {refresh_interval().total_seconds():g}s")
+    else:
+        update_index()
 
     # run some queries
 
@@ -162,6 +534,7 @@ def _main() -> None:
         end_time = time.time() - start_time
 
         print(f"Search completed in {end_time: .4f} seconds")
+        print(f"query cache: {get_query_cache().stats()}")
         print(f"found {len(results)} results")
 
         for i, result in enumerate(results):
@@ -170,12 +543,28 @@ def _main() -> None:
             print(f"Code preview: {result['code'][:200]}...")
             print("-" * 80)
 
-        save_vector_results(results, query)
+        # queued for the background writer, appended to RESULTS_LOG_PATH (search_results.jsonl)
+        get_results_log().log(query, results, end_time * 1000, top_k=5, backend=search_backend(),
+                              mode=search_mode())
 
         print("Search session ended.")
 
+    if updater is not None:
+        updater.abort()
+        updater.wait()
+    get_results_log().close()
+    get_chunk_cache().close()
+    get_query_cache().close()
+
 
 if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="index workout_forms and search it")
+    parser.add_argument("--live", action="store_true", help="keep the index updated while serving searches")
+    args = parser.parse_args()
+
     load_dotenv()
     cocoindex.init()
-    _main()
+    _main(live=args.live)
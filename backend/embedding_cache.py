@@ -0,0 +1,125 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+"""
+Bounded LRU cache for embedding vectors, optionally backed by a sqlite file so it survives restarts
+
+Keys are a hash of (model name, text) so vectors from different models never mix. Callers are expected
+to normalize the text before looking it up.
+
+Writes to the sqlite file are committed every commit_every puts (and on flush/close) rather than one
+transaction per vector. The file keeps at most max_disk_entries vectors, the oldest written are pruned first.
+"""
+
+
+def embedding_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, model: str, max_size: int = 1024, path: Optional[str] = None,
+                 max_disk_entries: int = 200000, commit_every: int = 256):
+        self.model = model
+        self.max_size = max_size
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.commit_every = commit_every
+        self._pending = 0  # puts written to sqlite but not committed yet
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0  # misses in memory that were found on disk (also counted in hits)
+        self._entries: "OrderedDict[str, NDArray[np.float32]]" = OrderedDict()
+        # search can run on several threads
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._db.commit()
+
+    def get(self, text: str) -> Optional[NDArray[np.float32]]:
+        key = embedding_key(self.model, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            if self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, vector: NDArray[np.float32]) -> None:
+        self.put_many([(text, vector)])
+
+    def put_many(self, items: Iterable[Tuple[str, NDArray[np.float32]]]) -> None:
+        rows = []
+        with self._lock:
+            for text, vector in items:
+                key = embedding_key(self.model, text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes()))
+            if self._db is not None and rows:
+                # a replaced key gets a new rowid, so rowid order is write order
+                self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+                self._pending += len(rows)
+                if self._pending >= self.commit_every:
+                    self._commit()
+
+    def flush(self) -> None:
+        """Commit vectors put since the last commit"""
+        with self._lock:
+            if self._db is not None and self._pending:
+                self._commit()
+
+    def _commit(self) -> None:
+        # rowids only grow, everything more than max_disk_entries below the newest one is the oldest data
+        self._db.execute("DELETE FROM embeddings WHERE rowid <= (SELECT max(rowid) FROM embeddings) - ?",
+                         (self.max_disk_entries,))
+        self._db.commit()
+        self._pending = 0
+
+    def _remember(self, key: str, vector: NDArray[np.float32]) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "size": len(self._entries),
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.disk_hits = 0
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
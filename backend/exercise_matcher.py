@@ -0,0 +1,132 @@
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+"""
+Exercise name classifier used by the agents backend
+
+Matches an exercise name against every keyword of the muscle map and the user's 1RM table in a single pass
+(Aho-Corasick automaton, built once), so lookups cost the same with 15 keywords or a catalog of hundreds.
+Results are cached by normalized name.
+
+Matching rules are the same as the old substring loops: the first muscle_map key (in dict order) found
+anywhere in the name decides the muscle groups, the first maxes key found decides the 1RM.
+"""
+
+# Simple muscle group mapping
+MUSCLE_MAP = {
+    "squat": ["quads", "glutes"],
+    "bench": ["chest", "shoulders", "triceps"],
+    "deadlift": ["back", "hamstrings", "glutes"],
+    "row": ["back", "biceps"],
+    "pullup": ["back", "biceps"],
+    "pull": ["back", "biceps"],
+    "press": ["shoulders", "triceps"],
+    "curl": ["biceps"],
+    "tricep": ["triceps"],
+    "dip": ["chest", "triceps"],
+    "lunge": ["quads", "glutes"],
+    "leg": ["quads", "hamstrings"],
+    "calf": ["calves"],
+    "abs": ["core"],
+    "plank": ["core"]
+}
+
+# User estimated 1RMs for percentage calculations
+DEFAULT_USER_MAXES = {
+    "squat": 405, "bench": 260, "deadlift": 500,
+    "row": 200, "press": 150, "curl": 100,
+    "pullup": 200, "dip": 250
+}
+
+
+class ExerciseMatch(NamedTuple):
+    muscle_key: Optional[str]  # muscle_map key that matched, None if nothing did
+    muscles: Tuple[str, ...]
+    max_key: Optional[str]  # maxes key that matched, None if nothing did
+    max_weight: Optional[float]
+
+
+def normalize_exercise_name(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class ExerciseMatcher:
+    def __init__(self, muscle_map: Dict[str, List[str]], maxes: Dict[str, float], cache_size: int = 4096):
+        self.muscle_map = dict(muscle_map)
+        self.maxes = dict(maxes)
+
+        # keyword -> [muscle_map rank, maxes rank], lower rank wins like the first hit of the old loops
+        ranks: Dict[str, List[Optional[int]]] = {}
+        for rank, key in enumerate(self.muscle_map):
+            keyword = normalize_exercise_name(key)
+            if keyword and keyword not in ranks:
+                ranks[keyword] = [rank, None]
+        for rank, key in enumerate(self.maxes):
+            keyword = normalize_exercise_name(key)
+            if keyword:
+                ranks.setdefault(keyword, [None, None])
+                if ranks[keyword][1] is None:
+                    ranks[keyword][1] = rank
+
+        self._muscle_keys = list(self.muscle_map)
+        self._max_keys = list(self.maxes)
+        self._build(ranks)
+        self._cached_match = lru_cache(maxsize=cache_size)(self._match_normalized)
+
+    def _build(self, ranks: Dict[str, List[Optional[int]]]) -> None:
+        # trie of every keyword, then failure links so the scan never backtracks over the name
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[List[Tuple[Optional[int], Optional[int]]]] = [[]]
+        for keyword, (muscle_rank, max_rank) in ranks.items():
+            state = 0
+            for ch in keyword:
+                if ch not in self._goto[state]:
+                    self._goto.append({})
+                    self._out.append([])
+                    self._goto[state][ch] = len(self._goto) - 1
+                state = self._goto[state][ch]
+            self._out[state].append((muscle_rank, max_rank))
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                # a keyword ending at the fallback state also ends here
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _match_normalized(self, name: str) -> ExerciseMatch:
+        best_muscle = None
+        best_max = None
+        state = 0
+        for ch in name:
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for muscle_rank, max_rank in self._out[state]:
+                if muscle_rank is not None and (best_muscle is None or muscle_rank < best_muscle):
+                    best_muscle = muscle_rank
+                if max_rank is not None and (best_max is None or max_rank < best_max):
+                    best_max = max_rank
+
+        muscle_key = self._muscle_keys[best_muscle] if best_muscle is not None else None
+        max_key = self._max_keys[best_max] if best_max is not None else None
+        return ExerciseMatch(
+            muscle_key=muscle_key,
+            muscles=tuple(self.muscle_map[muscle_key]) if muscle_key is not None else (),
+            max_key=max_key,
+            max_weight=self.maxes[max_key] if max_key is not None else None
+        )
+
+    def match(self, exercise_name: str) -> ExerciseMatch:
+        """Muscle groups and 1RM for an exercise name in one pass"""
+        return self._cached_match(normalize_exercise_name(exercise_name))
+
+    def cache_info(self):
+        return self._cached_match.cache_info()
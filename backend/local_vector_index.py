@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Iterable
+import numpy as np
+from numpy.typing import NDArray
+
+"""
+In-process exact vector search, a drop-in for the pgvector query in embedd_data.search
+
+The embeddings live in one contiguous float32 file that is memory-mapped, rows are L2 normalized when written,
+so cosine similarity for all chunks is a single matrix-vector product and top-k is an argpartition.
+Chunk metadata (filename, code, start, end) sits next to it in meta.json together with the fingerprint of the
+table it was built from, so sync() only reloads when the table changed.
+"""
+
+MATRIX_FILE = "embeddings.f32"
+META_FILE = "meta.json"
+
+# identifies the table contents without pulling the vectors to the client: the code and embedding of every chunk
+# in a stable order, so re-embedding the same code (new model, new normalization) also triggers a rebuild
+FINGERPRINT_SQL = """
+    SELECT count(*), coalesce(md5(string_agg(md5(filename || location::text || code || embedding::text), ''
+                                             ORDER BY filename, location)), '')
+    FROM {table}
+"""
+SELECT_ROWS_SQL = 'SELECT filename, code, embedding, start, "end" FROM {table} ORDER BY filename, location'
+
+
+def _normalize_rows(matrix: NDArray[np.float32]) -> NDArray[np.float32]:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class LocalVectorIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self.fingerprint = ""
+        # (matrix, rows) swapped as one tuple so a search never sees a matrix and metadata from different builds
+        self._data: tuple = (np.empty((0, 0), dtype=np.float32), [])
+        self._lock = threading.Lock()
+        if os.path.exists(os.path.join(path, META_FILE)):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._data[1])
+
+    def _load(self) -> None:
+        with open(os.path.join(self.path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        count, dim = len(meta["rows"]), meta["dim"]
+        if count:
+            matrix = np.memmap(os.path.join(self.path, MATRIX_FILE), dtype=np.float32, mode="r", shape=(count, dim))
+        else:
+            matrix = np.empty((0, dim), dtype=np.float32)
+        self.fingerprint = meta["fingerprint"]
+        self._data = (matrix, meta["rows"])
+
+    def build(self, rows: Iterable[tuple], fingerprint: str = "") -> None:
+        """Write the index from (filename, code, embedding, start, end) rows and switch searches over to it"""
+        rows = list(rows)
+        if rows:
+            matrix = _normalize_rows(np.asarray([row[2] for row in rows], dtype=np.float32))
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+        if not fingerprint:
+            fingerprint = hashlib.sha256(matrix.tobytes()).hexdigest()
+
+        os.makedirs(self.path, exist_ok=True)
+        matrix_path = os.path.join(self.path, MATRIX_FILE)
+        meta_path = os.path.join(self.path, META_FILE)
+        # write next to the live files and rename, open memmaps keep reading the old file until they're dropped
+        matrix.tofile(f"{matrix_path}.tmp")
+        with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": matrix.shape[1],
+                "fingerprint": fingerprint,
+                "rows": [{"filename": r[0], "code": r[1], "start": r[3], "end": r[4]} for r in rows]
+            }, f)
+        with self._lock:
+            os.replace(f"{matrix_path}.tmp", matrix_path)
+            os.replace(f"{meta_path}.tmp", meta_path)
+            self._load()
+
+    def sync(self, pool, table_name: str) -> bool:
+        """Rebuild from the pgvector table if it changed since the last build, returns True when it did"""
+        from pgvector.psycopg import register_vector
+
+        with pool.connection() as conn:
+            register_vector(conn)
+            with conn.cursor() as cur:
+                cur.execute(FINGERPRINT_SQL.format(table=table_name))
+                count, digest = cur.fetchone()
+                fingerprint = f"{count}:{digest}"
+                if fingerprint == self.fingerprint:
+                    return False
+                cur.execute(SELECT_ROWS_SQL.format(table=table_name))
+                rows = cur.fetchall()
+        self.build(rows, fingerprint)
+        return True
+
+    def _top_k(self, scores: NDArray[np.float32], rows: list, top_k: int) -> list[dict[str, Any]]:
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        # argpartition finds the k best in O(n), only those k get sorted
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [{
+            "filename": rows[i]["filename"],
+            "code": rows[i]["code"],
+            "score": float(scores[i]),
+            "start": rows[i]["start"],
+            "end": rows[i]["end"]
+        } for i in best.tolist()]
+
+    def search(self, query_vector: NDArray[np.float32], top_k: int = 5) -> list[dict[str, Any]]:
+        """Exact cosine top_k, same result format as embedd_data.search"""
+        matrix, rows = self._data
+        if not rows:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1)
+        return self._top_k(matrix @ query, rows, top_k)
+
+    def search_many(self, query_vectors: list[NDArray[np.float32]],
+                    top_k: int = 5) -> list[list[dict[str, Any]]]:
+        """One matrix-matrix product for all queries"""
+        matrix, rows = self._data
+        if not rows or not query_vectors:
+            return [[] for _ in query_vectors]
+        queries = _normalize_rows(np.asarray(query_vectors, dtype=np.float32))
+        scores = queries @ matrix.T
+        return [self._top_k(query_scores, rows, top_k) for query_scores in scores]
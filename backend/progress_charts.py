@@ -0,0 +1,208 @@
+import datetime
+import hashlib
+import io
+import os
+import re
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from workout_model import WorkoutLog
+from workout_store import DateLike, WorkoutStore, as_day
+
+"""
+Progress charts rendered off the chat/API thread
+
+Charts are drawn with the Agg backend through matplotlib's Figure API (no pyplot global state) on a single
+background worker. Rendered bytes are cached on disk under a key made of the chart kind, format, date range
+and the store's data_version, so a chart is only redrawn after new workouts were logged.
+"""
+
+CHART_KINDS = ("load", "muscle_volume", "one_rep_max")
+CHART_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+
+# estimated 1RM lines get unreadable past a handful of exercises
+MAX_1RM_EXERCISES = 5
+
+# cache files are {kind}-v{data_version}-{digest}.{fmt}, files from before versioned names have no -v part
+CACHE_FILE_RE = re.compile(r"^\w+(?:-v(?P<version>\d+))?-[0-9a-f]+\.\w+$")
+
+
+def estimated_1rm(weight: float, reps: int) -> float:
+    """Epley formula, a single is taken as is"""
+    if reps <= 1:
+        return weight
+    return weight * (1 + reps / 30)
+
+
+class ProgressCharts:
+    def __init__(self, store: WorkoutStore, analyze_batch: Callable, muscles_for: Callable[[str], Tuple[str, ...]],
+                 cache_dir: str = ".chart_cache"):
+        """
+        analyze_batch: agents.analyze_workouts_batch (or anything returning its per-workout results)
+        muscles_for: maps an exercise name to the muscle groups it trains
+        """
+        self.store = store
+        self.analyze_batch = analyze_batch
+        self.muscles_for = muscles_for
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        # one worker: renders never compete for CPU with each other and matplotlib stays single threaded
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="charts")
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.cache_hits = 0
+
+    def _cache_path(self, kind: str, fmt: str, start: str, end: str, version: int) -> str:
+        digest = hashlib.sha256(f"{kind}\0{fmt}\0{start}\0{end}\0{version}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{kind}-v{version}-{digest}.{fmt}")
+
+    def render(self, kind: str, fmt: str = "png", start: Optional[DateLike] = None,
+               end: Optional[DateLike] = None) -> "Future[bytes]":
+        """Chart bytes as a future, resolved immediately when the chart is cached on disk"""
+        if kind not in CHART_KINDS:
+            raise ValueError(f"Unknown chart '{kind}', expected one of {', '.join(CHART_KINDS)}")
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(CHART_FORMATS)}")
+
+        start, end = as_day(start, ""), as_day(end, "")
+        version = self.store.data_version()
+        path = self._cache_path(kind, fmt, start, end, version)
+        with self._lock:
+            pending = self._pending.get(path)
+            if pending is not None:
+                return pending  # same chart already queued, share the render
+            try:
+                with open(path, "rb") as f:
+                    cached = f.read()
+            except FileNotFoundError:
+                pass  # not rendered yet, or already superseded by a newer version
+            else:
+                self.cache_hits += 1
+                future: "Future[bytes]" = Future()
+                future.set_result(cached)
+                return future
+
+            future = self._executor.submit(self._render_to_cache, kind, fmt, start or None, end or None, version,
+                                           path)
+            self._pending[path] = future
+        future.add_done_callback(lambda _: self._forget(path))
+        return future
+
+    def chart(self, kind: str, fmt: str = "png", start: Optional[DateLike] = None,
+              end: Optional[DateLike] = None, timeout: Optional[float] = None) -> bytes:
+        """Blocking version of render"""
+        return self.render(kind, fmt, start, end).result(timeout)
+
+    def _forget(self, path: str) -> None:
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def _render_to_cache(self, kind: str, fmt: str, start: Optional[str], end: Optional[str], version: int,
+                         path: str) -> bytes:
+        log = self.store.workout_log_between(start, end)
+        fig = Figure(figsize=(8, 4.5), dpi=100, layout="constrained")
+        getattr(self, f"_draw_{kind}")(fig, log)
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt)
+        data = buffer.getvalue()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)  # readers never see a half written file
+        self.renders += 1
+        self._drop_stale(version)
+        return data
+
+    def _drop_stale(self, version: int) -> None:
+        """Delete charts drawn from older data, charts of the current version stay whatever their range"""
+        for name in os.listdir(self.cache_dir):
+            match = CACHE_FILE_RE.match(name)
+            if match is None or int(match["version"] or -1) >= version:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    @staticmethod
+    def _format_date_axis(ax) -> None:
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+    @staticmethod
+    def _no_data(fig: Figure, title: str) -> None:
+        ax = fig.subplots()
+        ax.set_title(title)
+        ax.text(0.5, 0.5, "No workouts logged in this range", ha="center", va="center", transform=ax.transAxes)
+        ax.set_axis_off()
+
+    def _draw_load(self, fig: Figure, log: WorkoutLog) -> None:
+        daily: Dict[datetime.date, float] = defaultdict(float)
+        for day, analysis in zip(log.dates, self.analyze_batch(log, include_breakdown=False)):
+            if "error" not in analysis:
+                daily[datetime.date.fromisoformat(day)] += analysis["total_load"]
+        if not daily:
+            return self._no_data(fig, "Training load")
+
+        days = sorted(daily)
+        ax = fig.subplots()
+        ax.bar(days, [daily[d] for d in days], color="#4c72b0")
+        ax.set_title("Training load")
+        ax.set_ylabel("Load")
+        self._format_date_axis(ax)
+
+    def _draw_muscle_volume(self, fig: Figure, log: WorkoutLog) -> None:
+        cols = log.columns()
+        volume: Dict[str, float] = defaultdict(float)
+        for name_id, entry_volume in zip(cols["name_ids"].tolist(),
+                                         (cols["sets"] * cols["reps"] * cols["weight"]).tolist()):
+            # same even split over muscle groups as the training load
+            muscles = self.muscles_for(log.names[name_id].lower()) or ("core",)
+            for muscle in muscles:
+                volume[muscle] += entry_volume / len(muscles)
+        if not volume:
+            return self._no_data(fig, "Volume per muscle group")
+
+        muscles = sorted(volume, key=volume.get)
+        ax = fig.subplots()
+        ax.barh(muscles, [volume[m] for m in muscles], color="#55a868")
+        ax.set_title("Volume per muscle group")
+        ax.set_xlabel("Volume (sets x reps x weight)")
+
+    def _draw_one_rep_max(self, fig: Figure, log: WorkoutLog) -> None:
+        cols = log.columns()
+        best: Dict[str, Dict[datetime.date, float]] = defaultdict(dict)
+        counts: Dict[str, int] = defaultdict(int)
+        for workout_idx, name_id, reps, weight in zip(cols["workout_idx"].tolist(), cols["name_ids"].tolist(),
+                                                      cols["reps"].tolist(), cols["weight"].tolist()):
+            if weight <= 0:
+                continue
+            name = log.names[name_id].lower()
+            day = datetime.date.fromisoformat(log.dates[workout_idx])
+            estimate = estimated_1rm(weight, reps)
+            counts[name] += 1
+            if estimate > best[name].get(day, 0.0):
+                best[name][day] = estimate
+        if not best:
+            return self._no_data(fig, "Estimated 1RM")
+
+        tracked: List[str] = sorted(counts, key=counts.get, reverse=True)[:MAX_1RM_EXERCISES]
+        ax = fig.subplots()
+        for name in tracked:
+            days = sorted(best[name])
+            ax.plot(days, [best[name][d] for d in days], marker="o", label=name.title())
+        ax.set_title("Estimated 1RM (Epley)")
+        ax.set_ylabel("Weight")
+        ax.legend(loc="best")
+        self._format_date_axis(ax)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,142 @@
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+"""
+Append-only JSONL log of searches, for replaying relevance and latency offline
+
+log() only puts a record on a queue, a background thread does the encoding and file I/O, so a search never
+waits on the disk. The file is flushed every flush_interval seconds and rotated to path.1, path.2, ...
+once it grows past max_bytes. If the queue is full (disk stalled) records are dropped and counted instead of
+blocking the caller. A record that can't be written (disk full, failed rotation) is counted as failed and the
+writer carries on with a reopened file, so one bad write doesn't silently end logging.
+"""
+
+_STOP = object()
+
+
+class ResultsLog:
+    def __init__(self, path: str = "search_results.jsonl", max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                 flush_interval: float = 1.0, queue_size: int = 10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.rotations = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._file = open(path, "a", encoding="utf-8", buffering=64 * 1024)
+        self._size = self._file.tell()
+        self._thread = threading.Thread(target=self._run, name="results-log", daemon=True)
+        self._thread.start()
+
+    def log(self, query: str, results: List[Dict[str, Any]], latency_ms: float, **extra: Any) -> None:
+        """Queue one search for the log, extra keys (backend, mode, top_k...) are stored as they are"""
+        record = {
+            "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "query": query,
+            "latency_ms": round(latency_ms, 3),
+            **extra,
+            "results": [{
+                "filename": r["filename"],
+                "score": round(r["score"], 6),
+                "start": r["start"],
+                "end": r["end"]
+            } for r in results]
+        }
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=64 * 1024)
+        self._size = 0
+        self.rotations += 1
+
+    def _reopen(self) -> None:
+        """Start over on a fresh file handle after an I/O error, whatever state the old one was left in"""
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        try:
+            self._file = open(self.path, "a", encoding="utf-8", buffering=64 * 1024)
+            self._size = self._file.tell()
+        except OSError as e:
+            print(f"results log: can't reopen {self.path}: {e}")
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str) + "\n"
+        size = len(line.encode("utf-8"))
+        if self._size and self._size + size > self.max_bytes:
+            self._rotate()
+        self._file.write(line)
+        self._size += size
+        self.written += 1
+
+    def _run(self) -> None:
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                record = self._queue.get(timeout=max(next_flush - time.monotonic(), 0))
+            except queue.Empty:
+                record = None
+
+            try:
+                if record is _STOP:
+                    self._file.flush()
+                    return
+                if record is not None:
+                    self._write(record)
+                if time.monotonic() >= next_flush:
+                    self._file.flush()
+                    next_flush = time.monotonic() + self.flush_interval
+            except Exception as e:
+                self.failed += 1
+                print(f"results log: write to {self.path} failed: {e}")
+                if record is _STOP:
+                    return
+                self._reopen()
+
+    def stats(self) -> Dict[str, int]:
+        return {"written": self.written, "dropped": self.dropped, "failed": self.failed,
+                "rotations": self.rotations, "queued": self._queue.qsize()}
+
+    def close(self) -> None:
+        """Write out everything queued so far and close the file"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        try:
+            self._file.close()
+        except OSError:
+            pass
+
+
+# shared log for the search loop and search_api
+# RESULTS_LOG_PATH picks the file, RESULTS_LOG_MAX_MB the size before rotating (default 10)
+_results_log: Optional[ResultsLog] = None
+
+
+def get_results_log() -> ResultsLog:
+    global _results_log
+
+    if _results_log is None:
+        _results_log = ResultsLog(os.getenv("RESULTS_LOG_PATH", "search_results.jsonl"),
+                                  max_bytes=int(float(os.getenv("RESULTS_LOG_MAX_MB", "10")) * 1024 * 1024))
+    return _results_log
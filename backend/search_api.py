@@ -0,0 +1,117 @@
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+import cocoindex
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.middleware.cors import CORSMiddleware
+from psycopg_pool import ConnectionPool
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+import embedd_data
+from embedding_batcher import EmbeddingBatcher
+from results_log import get_results_log
+
+# HTTP search over the workout_forms index
+# concurrent queries are embedded together (see EmbeddingBatcher), the SQL runs on the shared pool in worker threads
+#   SEARCH_BATCH_SIZE       most queries per model call (default 32)
+#   SEARCH_BATCH_WAIT_MS    how long the first query of a batch waits for others (default 5)
+#   SEARCH_POOL_MAX_SIZE    postgres connections (default 10)
+
+
+class Search_Result(BaseModel):
+    filename: str
+    code: str
+    score: float
+    start: Any
+    end: Any
+    rrf_score: Optional[float] = None  # only in hybrid mode
+
+
+class Search_Response(BaseModel):
+    query: str
+    results: List[Search_Result]
+    took_ms: float
+
+
+search_pool: Optional[ConnectionPool] = None
+batcher: Optional[EmbeddingBatcher] = None
+
+
+# load the model and open the pool once, before the first request
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global search_pool, batcher
+
+    load_dotenv()
+    cocoindex.init()
+    search_pool = ConnectionPool(os.getenv("COCOINDEX_DATABASE_URL"),
+                                 max_size=int(os.getenv("SEARCH_POOL_MAX_SIZE", "10")), open=False)
+    search_pool.open()
+    # tables and, in hybrid mode, the full-text index are created here so no request ever waits on DDL
+    await run_in_threadpool(embedd_data.setup_search, search_pool)
+    # loading the model is the slow part of startup, do it now rather than on the first query
+    await run_in_threadpool(embedd_data._embedding_model)
+    batcher = EmbeddingBatcher(embedd_data.embed_queries,
+                               max_batch=int(os.getenv("SEARCH_BATCH_SIZE", "32")),
+                               max_wait=float(os.getenv("SEARCH_BATCH_WAIT_MS", "5")) / 1000)
+    batcher.start()
+    yield
+    await batcher.stop()
+    search_pool.close()
+    get_results_log().close()
+    embedd_data.get_query_cache().close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+origins = [
+    "http://localhost:5173",
+    "http://127.0.0.1:5173",
+    "http://localhost:3000",
+]
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,
+    allow_credentials=True,
+    allow_methods=["GET"],
+    allow_headers=["*"],
+)
+
+
+@app.get("/search", response_model=Search_Response)
+async def search(q: str = Query(min_length=1), top_k: int = Query(5, ge=1, le=100),
+                 ef_search: Optional[int] = Query(None, ge=1), probes: Optional[int] = Query(None, ge=1)):
+    start = time.perf_counter()
+    try:
+        query_vector = await batcher.embed(q)
+        results = await run_in_threadpool(embedd_data.search, search_pool, q, top_k, ef_search, probes, query_vector)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
+    took_ms = (time.perf_counter() - start) * 1000
+    get_results_log().log(q, results, took_ms, top_k=top_k, backend=embedd_data.search_backend(),
+                          mode=embedd_data.search_mode(),
+                          ef_search=ef_search, probes=probes)
+    return {"query": q, "results": results, "took_ms": round(took_ms, 2)}
+
+
+@app.get("/health")
+def health_check() -> Dict[str, Any]:
+    return {
+        "status": "healthy",
+        "embedding_batches": batcher.stats() if batcher else None,
+        "query_cache": embedd_data.get_query_cache().stats(),
+        "results_log": get_results_log().stats(),
+        "db_pool": search_pool.get_stats() if search_pool else None
+    }
+
+
+def main() -> None:
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("SEARCH_API_PORT", "8001")))
+
+
+if __name__ == "__main__":
+    main()
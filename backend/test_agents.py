@@ -0,0 +1,278 @@
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+from types import SimpleNamespace
+import openai
+import pytest
+import agents
+import workout_store
+from agents import analyze_workout, analyze_workouts_batch
+from workout_model import Workout, WorkoutLog
+
+
+def make_workout(rng: random.Random, exercise_names: list) -> dict:
+    exercises = {}
+    for name in rng.sample(exercise_names, rng.randint(1, 5)):
+        exercises[name] = (rng.randint(1, 6), rng.randint(1, 15), rng.choice([45.0, 95.5, 135.0, 225.0, 315.0]),
+                           rng.randint(1, 10))
+    return {
+        "workout_20250101_1200": exercises,
+        "time": rng.randint(0, 120),
+        "muscles_targeted": ", ".join(rng.sample(["back", "biceps", "chest", "core", "quads"], rng.randint(0, 4))),
+        "date": "2025-01-01",
+        "exercise_count": len(exercises)
+    }
+
+
+def test_batch_matches_single_analysis():
+    rng = random.Random(42)
+    names = ["back squat", "bench press", "deadlift", "barbell row", "bicep curl", "plank", "leg press", "dips"]
+    workouts = [make_workout(rng, names) for _ in range(200)]
+
+    assert analyze_workouts_batch(workouts) == [analyze_workout(w) for w in workouts]
+
+
+def test_batch_errors_and_summary_only():
+    empty = {"workout_20250101_1200": {}, "time": 30, "muscles_targeted": ""}
+    workout = {"workout_20250101_1200": {"squat": (5, 5, 315.0, 8)}, "time": 45, "muscles_targeted": "glutes, quads"}
+
+    results = analyze_workouts_batch([{}, empty, workout], include_breakdown=False)
+
+    assert results[0] == {"error": "No workout data available. Please log a workout first."}
+    assert results[1] == {"error": "No valid exercises found in workout"}
+    assert "exercise_breakdown" not in results[2]
+    assert results[2]["total_load"] == analyze_workout(workout)["total_load"]
+
+
+@pytest.fixture
+def history_db(tmp_path, monkeypatch):
+    """Point the workout store at an empty database so build_prompt's training load never reads the real one"""
+    monkeypatch.setenv("WORKOUT_DB_PATH", str(tmp_path / "workout_history.db"))
+    monkeypatch.setattr(workout_store, "_workout_store", None)
+    monkeypatch.setattr(agents, "_training_load", None)
+    yield
+    if workout_store._workout_store is not None:
+        workout_store._workout_store.close()
+
+
+def test_analysis_is_shared_between_tools(history_db):
+    agents.clear_analysis_cache()
+    agents.analysis_cache_stats.update(hits=0, misses=0, serializations=0)
+    agents.current_workout_data = {
+        "workout_20250101_1200": {"squat": (5, 5, 315.0, 8), "bench press": (3, 8, 185.0, 7)},
+        "time": 60,
+        "muscles_targeted": "chest, glutes, quads",
+    }
+
+    try:
+        agents.meal_rec(agents.current_workout_data)
+        agents.recovery(7.5)
+        agents.build_prompt("how was it?", include_context=True)
+        agents.build_prompt("and now?", include_context=True)
+    finally:
+        agents.current_workout_data = None
+
+    assert agents.analysis_cache_stats == {"hits": 3, "misses": 1, "serializations": 1}
+
+
+def test_catalog_change_invalidates_cached_analysis(monkeypatch):
+    # set_exercise_catalog replaces these globals, monkeypatch puts the defaults back afterwards
+    for name in ("user_maxes", "exercise_matcher", "_training_load"):
+        monkeypatch.setattr(agents, name, getattr(agents, name))
+    workout = {"workout_20250101_1200": {"squat": (5, 5, 315.0, 8)}, "time": 45, "muscles_targeted": "quads"}
+    agents.clear_analysis_cache()
+    before = agents.cached_analysis(workout)
+
+    agents.set_exercise_catalog(maxes={"squat": 600})
+    after = agents.cached_analysis(workout)
+
+    assert after == analyze_workout(workout)
+    assert after["total_load"] != before["total_load"]
+    agents.clear_analysis_cache()
+
+
+class StubAsyncOpenAI:
+    """Records every prompt sent and answers with a canned reply"""
+    prompts = []
+
+    def __init__(self, **kwargs):
+        self.chat = self
+        self.completions = self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def create(self, model, messages, **params):
+        self.prompts.append(messages[-1]["content"])
+        message = type("Message", (), {"content": f"reply {len(self.prompts)}"})
+        return type("Completion", (), {"choices": [type("Choice", (), {"message": message})]})
+
+
+def test_full_report_sends_each_section_its_data(history_db, monkeypatch):
+    monkeypatch.setattr(openai, "AsyncOpenAI", StubAsyncOpenAI)
+    monkeypatch.setattr(StubAsyncOpenAI, "prompts", [])
+    monkeypatch.setattr(agents, "_response_cache", agents.ResponseCache(max_size=0))
+    workout = {
+        "workout_20250101_1200": {"squat": (5, 5, 315.0, 8), "bench press": (3, 8, 185.0, 7)},
+        "time": 60,
+        "muscles_targeted": "chest, glutes, quads",
+    }
+    monkeypatch.setattr(agents, "current_workout_data", workout)
+
+    report = asyncio.run(agents.full_report(sleep_hours=5.5, timeout=5))
+
+    analysis = agents.cached_analysis(workout)
+    meal_recs = agents.meal_rec(workout)
+    recovery_plan = agents.recovery(5.5, analysis["muscle_groups"], analysis["intensity_level"].lower())
+    prompts = StubAsyncOpenAI.prompts
+    assert len(prompts) == 3
+    for prompt_txt, data in ((agents.analyze_prompt, analysis), (agents.meal_rec_prompt, meal_recs),
+                             (agents.recovery_prompt, recovery_plan)):
+        sent = next(p for p in prompts if p.startswith(prompt_txt))
+        assert json.dumps(data, indent=2, default=str) in sent
+        # the analysis is the workout context, it is only sent once
+        assert ("Current workout context:" in sent) == (prompt_txt != agents.analyze_prompt)
+    assert '"hours": 5.5' in next(p for p in prompts if p.startswith(agents.recovery_prompt))
+    assert "Recovery (5.5 hours of sleep):" in report
+
+
+def stream_chunk(content=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=content))] if content is not None else []
+    return SimpleNamespace(choices=choices, usage=SimpleNamespace(completion_tokens=usage) if usage else None)
+
+
+class StubStreamClient:
+    """Streams the given chunks, an exception in the list is raised at that point of the stream"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.prompts = []
+        self.chat = self
+        self.completions = self
+
+    def create(self, model, messages, stream, **params):
+        self.prompts.append(messages[-1]["content"])
+        for chunk in self.chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+@pytest.fixture
+def stream_client(history_db, monkeypatch):
+    monkeypatch.setattr(agents, "_response_cache", agents.ResponseCache(max_size=8))
+    monkeypatch.setattr(agents, "current_workout_data", None)
+
+    def install(chunks):
+        client = StubStreamClient(chunks)
+        monkeypatch.setattr(agents, "get_llm_client", lambda: client)
+        return client
+    return install
+
+
+def test_stream_strips_leading_whitespace_and_counts_chunks(stream_client):
+    stream_client([stream_chunk("  "), stream_chunk("\n Keep"), stream_chunk(""), stream_chunk(" going")])
+
+    reply = agents.stream_gpt("how was it?", prefix="Coach: ")
+
+    assert list(reply) == ["Coach: ", "Keep", " going"]
+    assert reply.text == "Keep going"
+    assert reply.tokens == 2  # no usage reported, one token per chunk
+    assert reply.time_to_first_token is not None and not reply.cached
+
+
+def test_stream_uses_reported_usage_and_caches_reply(stream_client):
+    client = stream_client([stream_chunk("Rest"), stream_chunk(" today"), stream_chunk(usage=7)])
+
+    first = agents.stream_gpt("should I train?")
+    assert "".join(first) == "Rest today"
+    assert first.tokens == 7
+
+    again = agents.stream_gpt("should I train?")
+    assert list(again) == ["Rest today"]
+    assert again.cached and again.stats_line() == "(cached response)"
+    assert len(client.prompts) == 1
+
+
+def test_stream_error_mid_reply_is_reported_not_cached(stream_client):
+    client = stream_client([stream_chunk("Squat"), RuntimeError("connection reset")])
+
+    reply = agents.stream_gpt("squat tips?")
+    assert list(reply) == ["Squat", "Unexpected error: connection reset"]
+    assert reply.tokens == 1
+
+    client.chunks = [stream_chunk("Brace")]
+    assert list(agents.stream_gpt("squat tips?")) == ["Brace"]
+
+
+def test_streamed_commands_send_tool_data(stream_client, monkeypatch):
+    client = stream_client([stream_chunk("ok")])
+    workout = {"workout_20250101_1200": {"squat": (5, 5, 315.0, 8)}, "time": 45, "muscles_targeted": "quads"}
+    monkeypatch.setattr(agents, "current_workout_data", workout)
+
+    list(agents.process_user_command("analyze", stream=True))
+    list(agents.process_user_command("meal", stream=True))
+    list(agents.process_user_command("recovery 6", stream=True))
+
+    analysis, meal, recovery = client.prompts
+    assert json.dumps(agents.cached_analysis(workout), indent=2) in analysis
+    assert "Current workout context:" not in analysis
+    assert json.dumps(agents.meal_rec(workout), indent=2, default=str) in meal
+    assert "Current workout context:" in meal
+    assert '"hours": 6.0' in recovery
+
+
+def test_streaming_reads_settings_from_env_file(history_db, monkeypatch):
+    # stands in for a .env with LLM_CACHE_SIZE=3, stream_gpt is the first thing this frontend calls
+    monkeypatch.setattr(agents, "load_env", lambda: monkeypatch.setenv("LLM_CACHE_SIZE", "3"))
+    monkeypatch.delenv("LLM_CACHE_SIZE", raising=False)
+    monkeypatch.setattr(agents, "_response_cache", None)
+    monkeypatch.setattr(agents, "get_llm_client", lambda: StubStreamClient([stream_chunk("ok")]))
+
+    list(agents.stream_gpt("hi"))
+
+    assert agents.get_response_cache().max_size == 3
+
+
+def test_report_command_needs_exact_command_word(monkeypatch):
+    monkeypatch.setattr(agents, "connect_to_gpt", lambda prompt, include_context=False: f"coach: {prompt}")
+
+    assert agents.report_command("report") == 7.0
+    assert agents.report_command("report 6.5") == 6.5
+    assert agents.report_command("report please") is None
+    assert agents.process_user_command("reports say creatine helps") == "coach: reports say creatine helps"
+
+
+def test_chart_command_needs_exact_command_word(monkeypatch):
+    monkeypatch.setattr(agents, "connect_to_gpt", lambda prompt, include_context=False: f"coach: {prompt}")
+
+    assert agents.chart_command("chart") == ("load", "png")
+    assert agents.chart_command("chart one_rep_max svg") == ("one_rep_max", "svg")
+    assert agents.chart_command("charts") is None
+    assert agents.process_user_command("chart my squat progress please") == "coach: chart my squat progress please"
+
+
+def test_workout_log_round_trip_and_batch():
+    rng = random.Random(3)
+    names = ["back squat", "bench press", "deadlift", "bicep curl", "plank"]
+    workouts = [make_workout(rng, names) for _ in range(50)]
+
+    log = WorkoutLog.from_legacy(workouts)
+
+    assert len(log) == 50
+    assert log.to_legacy() == workouts
+    assert Workout.from_legacy(workouts[7]) == log[7]
+    assert analyze_workouts_batch(log) == [analyze_workout(w) for w in workouts]
+
+
+def test_import_defers_heavy_dependencies():
+    check = "import sys, agents; print([m for m in ('numpy', 'openai', 'matplotlib', 'dotenv') if m in sys.modules])"
+    out = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert out.stdout.strip() == "[]"
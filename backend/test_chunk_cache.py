@@ -0,0 +1,48 @@
+import numpy as np
+import embedd_data
+from embedding_cache import EmbeddingCache
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, convert_to_numpy=True):
+        self.calls += 1
+        return np.full(embedd_data.EMBEDDING_DIM, len(text), dtype=np.float32)
+
+
+def test_embed_chunk_reuses_vectors_across_runs(tmp_path, monkeypatch):
+    model = CountingModel()
+    monkeypatch.setattr(embedd_data, "_embedding_model", lambda: model)
+    path = str(tmp_path / "chunks.db")
+    monkeypatch.setattr(embedd_data, "_chunk_cache", EmbeddingCache(embedd_data.EMBEDDING_MODEL, path=path))
+
+    first = embedd_data.embed_chunk("keep your chest up")
+    embedd_data.embed_chunk("keep your chest up")
+    assert model.calls == 1
+    assert embedd_data.take_chunk_cache_stats()["hit_rate"] == 0.5
+
+    # a new run (fresh process) finds the vector on disk once the first one has closed its cache
+    embedd_data.get_chunk_cache().close()
+    monkeypatch.setattr(embedd_data, "_chunk_cache", EmbeddingCache(embedd_data.EMBEDDING_MODEL, path=path))
+    assert np.array_equal(embedd_data.embed_chunk("keep your chest up"), first)
+    assert model.calls == 1
+    assert embedd_data.take_chunk_cache_stats()["disk_hits"] == 1
+
+
+def test_disk_writes_are_batched_and_capped(tmp_path):
+    path = str(tmp_path / "chunks.db")
+    cache = EmbeddingCache("model", max_size=1, path=path, max_disk_entries=3, commit_every=4)
+    cache.put_many((f"chunk {i}", np.full(4, i, dtype=np.float32)) for i in range(3))
+
+    # not committed yet, another process sees nothing
+    assert EmbeddingCache("model", path=path).get("chunk 0") is None
+
+    cache.put("chunk 3", np.full(4, 3, dtype=np.float32))
+    cache.put("chunk 4", np.full(4, 4, dtype=np.float32))
+    cache.close()
+
+    reopened = EmbeddingCache("model", path=path)
+    assert reopened.get("chunk 0") is None  # pruned, only the newest 3 are kept
+    assert [reopened.get(f"chunk {i}")[0] for i in (2, 3, 4)] == [2, 3, 4]
@@ -0,0 +1,32 @@
+import embedd_data
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.settings = {}
+
+    def execute(self, query, params):
+        name = query.split("'")[1]
+        self.settings[name] = params[0]
+
+
+def ann_settings(top_k, ef_search=None, probes=None):
+    cur = RecordingCursor()
+    embedd_data._apply_ann_settings(cur, top_k, ef_search, probes)
+    return cur.settings
+
+
+def test_hnsw_ef_search_always_covers_top_k(monkeypatch):
+    for name in ("VECTOR_INDEX", "HNSW_EF_SEARCH", "IVFFLAT_PROBES"):
+        monkeypatch.delenv(name, raising=False)
+
+    assert ann_settings(5) == {"hnsw.ef_search": "40"}
+    assert ann_settings(100) == {"hnsw.ef_search": "100"}
+    assert ann_settings(5, ef_search=80) == {"hnsw.ef_search": "80"}
+
+    monkeypatch.setenv("HNSW_EF_SEARCH", "20")
+    assert ann_settings(50) == {"hnsw.ef_search": "50"}
+
+    monkeypatch.setenv("VECTOR_INDEX", "ivfflat")
+    assert ann_settings(100) == {}
+    assert ann_settings(100, probes=10) == {"ivfflat.probes": "10"}
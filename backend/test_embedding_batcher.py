@@ -0,0 +1,37 @@
+import asyncio
+import numpy as np
+from embedding_batcher import EmbeddingBatcher
+
+
+def test_concurrent_queries_share_one_encode_call():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return [np.full(3, len(text), dtype=np.float32) for text in texts]
+
+    async def run():
+        batcher = EmbeddingBatcher(encode, max_batch=4, max_wait=0.05)
+        batcher.start()
+        vectors = await asyncio.gather(*(batcher.embed("x" * n) for n in range(1, 7)))
+        await batcher.stop()
+        return vectors, batcher.stats()
+
+    vectors, stats = asyncio.run(run())
+    assert [v[0] for v in vectors] == [1, 2, 3, 4, 5, 6]
+    assert [len(batch) for batch in calls] == [4, 2]
+    assert stats["batches"] == 2 and stats["avg_batch_size"] == 3.0
+
+
+def test_encode_error_reaches_every_caller():
+    def encode(texts):
+        raise ValueError("model failed")
+
+    async def run():
+        batcher = EmbeddingBatcher(encode, max_wait=0.01)
+        batcher.start()
+        results = await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(run()))
@@ -0,0 +1,43 @@
+import random
+from exercise_matcher import ExerciseMatcher, MUSCLE_MAP, DEFAULT_USER_MAXES
+
+
+def linear_match(name: str, muscle_map: dict, maxes: dict):
+    # the substring loops the matcher replaced
+    muscle_key = next((key for key in muscle_map if key in name), None)
+    max_key = next((key for key in maxes if key in name), None)
+    return muscle_key, max_key
+
+
+def test_matches_linear_scan():
+    matcher = ExerciseMatcher(MUSCLE_MAP, DEFAULT_USER_MAXES)
+    names = ["back squat", "leg press", "bench press", "pullup", "pull up", "romanian deadlift",
+             "tricep dips", "seated calf raise", "hanging abs", "walking lunge", "barbell row", "hammer curl",
+             "farmer carry", "dumbbell bench", "overhead press", "preacher curl", "plank"]
+
+    for name in names:
+        match = matcher.match(name)
+        assert (match.muscle_key, match.max_key) == linear_match(name, MUSCLE_MAP, DEFAULT_USER_MAXES)
+        assert match.muscles == tuple(MUSCLE_MAP.get(match.muscle_key, ()))
+        assert match.max_weight == DEFAULT_USER_MAXES.get(match.max_key)
+
+
+def test_large_catalog_and_normalization():
+    rng = random.Random(7)
+    letters = "abcdefghij"
+    catalog = {"".join(rng.choice(letters) for _ in range(rng.randint(2, 6))): ["core"] for _ in range(500)}
+    maxes = {key: rng.randint(50, 500) for key in list(catalog)[::3]}
+    matcher = ExerciseMatcher(catalog, maxes)
+
+    for _ in range(300):
+        name = "".join(rng.choice(letters + " ") for _ in range(rng.randint(5, 25))).strip()
+        normalized = " ".join(name.split())
+        match = matcher.match(name.upper())
+        assert (match.muscle_key, match.max_key) == linear_match(normalized, catalog, maxes)
+
+
+def test_normalized_names_share_cache_entry():
+    matcher = ExerciseMatcher(MUSCLE_MAP, DEFAULT_USER_MAXES)
+
+    assert matcher.match("  Back   SQUAT ") == matcher.match("back squat")
+    assert matcher.cache_info().hits == 1
@@ -0,0 +1,38 @@
+import numpy as np
+from local_vector_index import LocalVectorIndex
+
+
+def make_rows(rng: np.random.Generator, count: int, dim: int = 16) -> list:
+    return [(f"form_{i}.md", f"chunk {i}", rng.normal(size=dim).astype(np.float32), {"line": i}, {"line": i + 1})
+            for i in range(count)]
+
+
+def test_top_k_matches_brute_force(tmp_path):
+    rng = np.random.default_rng(3)
+    rows = make_rows(rng, 200)
+    index = LocalVectorIndex(str(tmp_path / "index"))
+    index.build(rows)
+
+    query = rng.normal(size=16).astype(np.float32)
+    matrix = np.array([row[2] for row in rows])
+    cosine = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+    expected = np.argsort(-cosine)[:5]
+
+    results = index.search(query, top_k=5)
+    assert [r["filename"] for r in results] == [rows[i][0] for i in expected]
+    assert np.allclose([r["score"] for r in results], cosine[expected], atol=1e-5)
+    assert results[0]["start"] == rows[expected[0]][3]
+    batched = index.search_many([query, -query], top_k=5)
+    assert [r["filename"] for r in batched[0]] == [r["filename"] for r in results]
+    assert [r["filename"] for r in batched[1]] == [rows[i][0] for i in np.argsort(cosine)[:5]]
+
+
+def test_reopen_from_disk(tmp_path):
+    rows = make_rows(np.random.default_rng(5), 10)
+    LocalVectorIndex(str(tmp_path)).build(rows, fingerprint="v1")
+
+    reopened = LocalVectorIndex(str(tmp_path))
+    assert len(reopened) == 10
+    assert reopened.fingerprint == "v1"
+    assert reopened.search(rows[4][2], top_k=1)[0]["code"] == "chunk 4"
+    assert len(reopened.search(rows[4][2], top_k=50)) == 10
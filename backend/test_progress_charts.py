@@ -0,0 +1,42 @@
+import os
+from progress_charts import ProgressCharts, estimated_1rm
+from test_workout_store import make_workout
+from workout_store import WorkoutStore
+
+
+def fake_analyze(log, include_breakdown=True):
+    return [{"total_load": float(sum(e.volume for e in workout.exercises))} for workout in log]
+
+
+def test_charts_cached_until_data_changes(tmp_path):
+    store = WorkoutStore(str(tmp_path / "history.db"))
+    store.add_workout(make_workout("2025-01-01", {"squat": (5, 5, 315.0, 8)}))
+    charts = ProgressCharts(store, fake_analyze, lambda name: ("quads",), cache_dir=str(tmp_path / "charts"))
+
+    png = charts.chart("load")
+    assert png.startswith(b"\x89PNG")
+    assert charts.chart("load") == png
+    assert (charts.renders, charts.cache_hits) == (1, 1)
+
+    assert b"<svg" in charts.chart("one_rep_max", "svg")
+    assert charts.renders == 2
+
+    # other date ranges of the same data stay cached
+    charts.chart("load", start="2025-01-01", end="2025-01-31")
+    assert charts.chart("load") == png
+    assert (charts.renders, charts.cache_hits) == (3, 2)
+
+    version = store.data_version()
+    store.add_workout(make_workout("2025-01-08", {"squat": (5, 5, 325.0, 8)}))
+    assert store.data_version() == version + 1
+    charts.chart("load")
+    assert charts.renders == 4
+    # everything drawn from the old data is gone
+    assert [name.split("-")[:2] for name in os.listdir(tmp_path / "charts")] == [["load", f"v{version + 1}"]]
+    charts.close()
+    store.close()
+
+
+def test_estimated_1rm():
+    assert estimated_1rm(300.0, 1) == 300.0
+    assert estimated_1rm(300.0, 10) == 400.0
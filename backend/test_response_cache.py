@@ -0,0 +1,51 @@
+import response_cache
+from response_cache import ResponseCache, response_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache.time, "monotonic", clock)
+    cache = ResponseCache(max_size=4, ttl=60)
+    cache.put("a", "reply")
+
+    clock.now += 59
+    assert cache.get("a") == "reply"
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 0}
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResponseCache(max_size=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # b is now the oldest
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+
+
+def test_size_zero_disables_cache():
+    cache = ResponseCache(max_size=0)
+    cache.put("a", "1")
+    assert cache.get("a") is None and cache.stats()["size"] == 0
+
+
+def test_response_key_is_stable():
+    params = {"temperature": 1.0, "max_tokens": 1500}
+    key = response_key("model", "system", "prompt", params)
+
+    assert key == response_key("model", "system", "prompt", {"max_tokens": 1500, "temperature": 1.0})
+    assert key != response_key("model", "system", "prompt ", params)
+    assert key != response_key("model", "prompt", "system", params)
+    # the same on every run, not seeded per process like hash()
+    assert response_key("m", "p") == "43fd693a4923b1c8d443fcc5d6138e0428b7745910bf373d124a29809cda6f30"
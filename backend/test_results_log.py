@@ -0,0 +1,56 @@
+import json
+from results_log import ResultsLog
+
+RESULTS = [{"filename": "squat.md", "code": "...", "score": 0.91, "start": {"line": 1}, "end": {"line": 9}}]
+
+
+def test_records_are_appended_as_jsonl(tmp_path):
+    path = tmp_path / "results.jsonl"
+    log = ResultsLog(str(path))
+    log.log("squat depth", RESULTS, 12.5, top_k=5)
+    log.close()
+
+    log = ResultsLog(str(path))  # reopening keeps the history
+    log.log("bench arch", [], 3.0)
+    log.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["query"] for r in records] == ["squat depth", "bench arch"]
+    assert records[0]["results"] == [{"filename": "squat.md", "score": 0.91, "start": {"line": 1}, "end": {"line": 9}}]
+    assert records[0]["top_k"] == 5 and records[0]["latency_ms"] == 12.5
+
+
+def test_rotation(tmp_path):
+    path = tmp_path / "results.jsonl"
+    log = ResultsLog(str(path), max_bytes=2000, backups=2)
+    for i in range(100):
+        log.log(f"query {i}", RESULTS, 1.0)
+    log.close()
+
+    assert log.written == 100 and log.rotations > 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["results.jsonl", "results.jsonl.1", "results.jsonl.2"]
+    assert all(p.stat().st_size <= 2000 for p in tmp_path.iterdir())
+    last = json.loads(path.read_text().splitlines()[-1])
+    assert last["query"] == "query 99"
+
+
+def test_writer_survives_failed_writes(tmp_path, monkeypatch):
+    path = tmp_path / "results.jsonl"
+    log = ResultsLog(str(path), max_bytes=500)
+    rotate = log._rotate
+    calls = []
+
+    def flaky_rotate():
+        calls.append(1)
+        if len(calls) == 1:
+            log._file.close()
+            raise OSError("No space left on device")
+        rotate()
+
+    monkeypatch.setattr(log, "_rotate", flaky_rotate)
+    for i in range(10):
+        log.log(f"query {i}", RESULTS, 1.0)
+    log.close()
+
+    assert log.failed == 1 and log.written == 9
+    assert log.stats()["failed"] == 1
@@ -0,0 +1,13 @@
+from text_normalize import normalize_text, tokenize
+
+
+def test_normalize_markup_and_whitespace():
+    text = "<p>Keep your <b>Chest</b>  UP</p>\n\n<!-- cue -->Brace   the core"
+    assert normalize_text(text, ".md") == "keep your chest up brace the core"
+    # code keeps its angle brackets
+    assert normalize_text("let v: Vec<String> =\n  Vec::new();", ".rs") == "let v: vec<string> = vec::new();"
+
+
+def test_stopword_filter():
+    assert normalize_text("How do I keep my knees out?", remove_stopwords=True) == "keep knees ?"
+    assert tokenize("don't stop") == ["don't", "stop"]
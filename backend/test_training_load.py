@@ -0,0 +1,46 @@
+import datetime
+import random
+from training_load import TrainingLoadTracker, RollingWindow
+
+
+def test_rolling_window_matches_rescan():
+    rng = random.Random(11)
+    window = RollingWindow(7)
+    events = []
+    day = datetime.date(2025, 1, 1)
+    for _ in range(300):
+        day += datetime.timedelta(days=rng.choice([0, 1, 1, 2, 5, 9]))
+        # mostly in order, sometimes a backfill a few days back
+        event_day = day - datetime.timedelta(days=rng.choice([0, 0, 0, 3, 10]))
+        key = rng.choice(["a", "b"])
+        value = rng.uniform(0, 100)
+        events.append((event_day, key, value))
+        window.add(event_day, key, value)
+
+        start = window.end - datetime.timedelta(days=6)
+        for k in ("a", "b"):
+            expected = sum(v for d, kk, v in events if kk == k and start <= d <= window.end)
+            assert abs(window.get(k) - expected) < 1e-6
+
+
+def test_tracker_summary():
+    tracker = TrainingLoadTracker(lambda name: ("quads", "glutes") if "squat" in name else ())
+    analysis = {
+        "total_load": 100.0,
+        "exercise_breakdown": [{"name": "Back Squat", "volume": 1000.0, "load_contribution": 100.0}]
+    }
+    start = datetime.date(2025, 3, 1)
+    for i in range(28):
+        tracker.add_workout(start + datetime.timedelta(days=i), analysis)
+
+    summary = tracker.summary()
+    assert summary["acute_load_7d"] == 700.0
+    assert summary["chronic_load_28d"] == 2800.0
+    assert summary["acwr"] == 1.0
+    assert summary["muscle_groups"]["quads"]["acute_load_7d"] == 350.0
+    assert summary["weekly_volume"] == {"back squat": 7000.0}
+
+    # a week without training
+    later = tracker.summary(as_of=start + datetime.timedelta(days=34))
+    assert later["acute_load_7d"] == 0.0
+    assert later["acwr"] == 0.0
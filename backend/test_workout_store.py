@@ -0,0 +1,41 @@
+from workout_model import Workout
+from workout_store import WorkoutStore
+
+
+def make_workout(day: str, exercises: dict) -> dict:
+    return {
+        f"workout_{day.replace('-', '')}_1200": exercises,
+        "time": 45,
+        "muscles_targeted": "chest, quads",
+        "date": day,
+        "exercise_count": len(exercises)
+    }
+
+
+def test_round_trip_and_date_range(tmp_path):
+    store = WorkoutStore(str(tmp_path / "history.db"))
+    workouts = [
+        make_workout("2025-01-01", {"squat": (5, 5, 315.0, 8)}),
+        make_workout("2025-01-15", {"bench press": (3, 8, 185.0, 7), "squat": (3, 5, 335.0, 9)}),
+        make_workout("2025-02-01", {"deadlift": (1, 5, 405.0, 9)}),
+    ]
+    store.add_workouts(workouts)
+
+    assert store.legacy_workouts_between() == workouts
+    assert store.legacy_workouts_between("2025-01-10", "2025-01-31") == [workouts[1]]
+    assert [w.date for w in store.workouts_between(end="2025-01-15")] == ["2025-01-01", "2025-01-15"]
+    store.close()
+
+
+def test_exercise_history_and_reopen(tmp_path):
+    path = str(tmp_path / "history.db")
+    store = WorkoutStore(path)
+    store.add_workout(make_workout("2025-03-01", {"squat": (5, 5, 300.0, 7)}))
+    store.add_workout(Workout.from_legacy(make_workout("2025-03-08", {"squat": (5, 5, 310.0, 8)})))
+    store.close()
+
+    reopened = WorkoutStore(path)
+    assert reopened.exercise_history("squat") == [("2025-03-01", 5, 5, 300.0, 7), ("2025-03-08", 5, 5, 310.0, 8)]
+    assert reopened.exercise_history("squat", start="2025-03-02") == [("2025-03-08", 5, 5, 310.0, 8)]
+    assert len(reopened.workout_log_between("2025-03-01", "2025-03-31")) == 2
+    reopened.close()
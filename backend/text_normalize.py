@@ -0,0 +1,52 @@
+import re
+
+"""
+Offline text normalization for the embedding pipeline
+
+Everything here is bundled (regexes compiled once at import, the NLTK English stopword list copied in),
+so chunks can be normalized without nltk or any download. Used on indexed chunks and on search queries,
+which must go through the same steps to land in the same embedding space.
+"""
+
+# the NLTK English stopword list
+ENGLISH_STOPWORDS = frozenset("""
+a about above after again against ain all am an and any are aren aren't as at be because been before being
+below between both but by can couldn couldn't d did didn didn't do does doesn doesn't doing don don't down
+during each few for from further had hadn hadn't has hasn hasn't have haven haven't having he her here hers
+herself him himself his how i if in into is isn isn't it it's its itself just ll m ma me mightn mightn't more
+most mustn mustn't my myself needn needn't no nor not now o of off on once only or other our ours ourselves
+out over own re s same shan shan't she she's should should've shouldn shouldn't so some such t than that
+that'll the their theirs them themselves then there these they this those through to too under until up ve
+very was wasn wasn't we were weren weren't what when where which while who whom why will with won won't
+wouldn wouldn't y you you'd you'll you're you've your yours yourself yourselves
+""".split())
+
+# markup files (workout form write-ups) can carry inline HTML, code files keep their <...> (generics, comparisons)
+HTML_LANGUAGES = frozenset({".md", ".markdown", ".html", ".htm"})
+
+HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+HTML_TAG_RE = re.compile(r"</?[A-Za-z][A-Za-z0-9-]*(?:\s[^<>]*)?/?>")
+WHITESPACE_RE = re.compile(r"\s+")
+# words (keeping contractions together so they match the stopword list) or single punctuation marks
+TOKEN_RE = re.compile(r"\w+(?:'\w+)?|[^\w\s]")
+
+
+def strip_html(text: str) -> str:
+    return HTML_TAG_RE.sub(" ", HTML_COMMENT_RE.sub(" ", text))
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text)
+
+
+def normalize_text(text: str, language: str = "", remove_stopwords: bool = False) -> str:
+    """
+    Lowercase, collapse whitespace and strip HTML (markup languages only)
+    remove_stopwords also drops English stopwords, which shortens prose chunks before embedding
+    """
+    if language.lower() in HTML_LANGUAGES:
+        text = strip_html(text)
+    text = text.lower()
+    if remove_stopwords:
+        return " ".join(token for token in tokenize(text) if token not in ENGLISH_STOPWORDS)
+    return WHITESPACE_RE.sub(" ", text).strip()
@@ -0,0 +1,159 @@
+import datetime
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+"""
+Rolling training load analytics
+
+Keeps 7-day (acute) and 28-day (chronic) load totals, per muscle group load and weekly volume per exercise
+up to date as workouts are logged. Each new workout only touches its own day's bucket and the running sums,
+history is never rescanned.
+
+ACWR (acute:chronic workload ratio) = acute load / average weekly load over the chronic window.
+"""
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+
+# running total over every muscle group / exercise
+TOTAL = "total"
+
+DayLike = Union[str, datetime.date]
+
+
+def _as_date(day: DayLike) -> datetime.date:
+    if isinstance(day, datetime.date):
+        return day
+    return datetime.date.fromisoformat(day)
+
+
+class RollingWindow:
+    """
+    Per-key sums over the last `days` days, ending at the newest day seen
+    Moving the window forward subtracts the buckets that fall out, so the cost is spread over the days passed
+    """
+
+    def __init__(self, days: int):
+        self.days = days
+        self.end: Optional[datetime.date] = None
+        self.buckets: Dict[datetime.date, Dict[str, float]] = {}
+        self.totals: Dict[str, float] = defaultdict(float)
+
+    @property
+    def start(self) -> Optional[datetime.date]:
+        if self.end is None:
+            return None
+        return self.end - datetime.timedelta(days=self.days - 1)
+
+    def advance(self, day: datetime.date) -> None:
+        if self.end is not None and day <= self.end:
+            return
+        if self.end is not None:
+            new_start = day - datetime.timedelta(days=self.days - 1)
+            if (day - self.end).days >= self.days:
+                self.buckets.clear()
+                self.totals.clear()
+            else:
+                current = self.start
+                while current < new_start:
+                    for key, value in self.buckets.pop(current, {}).items():
+                        self.totals[key] -= value
+                        if abs(self.totals[key]) < 1e-9:
+                            del self.totals[key]  # drop float leftovers of keys that left the window
+                    current += datetime.timedelta(days=1)
+        self.end = day
+
+    def add(self, day: datetime.date, key: str, value: float) -> None:
+        self.advance(day)
+        if day < self.start:
+            return  # older than the window, it can't change the sums any more
+        bucket = self.buckets.setdefault(day, defaultdict(float))
+        bucket[key] += value
+        self.totals[key] += value
+
+    def get(self, key: str) -> float:
+        return self.totals.get(key, 0.0)
+
+
+def acwr_zone(ratio: Optional[float]) -> str:
+    if ratio is None:
+        return "not enough history"
+    if ratio < 0.8:
+        return "undertraining"
+    if ratio <= 1.3:
+        return "optimal"
+    if ratio <= 1.5:
+        return "caution"
+    return "high injury risk"
+
+
+class TrainingLoadTracker:
+    def __init__(self, muscles_for: Callable[[str], Tuple[str, ...]]):
+        """muscles_for maps an exercise name to the muscle groups it trains"""
+        self.muscles_for = muscles_for
+        self.acute = RollingWindow(ACUTE_DAYS)
+        self.chronic = RollingWindow(CHRONIC_DAYS)
+        self.weekly_volume = RollingWindow(ACUTE_DAYS)
+
+    def add_workout(self, day: DayLike, analysis: Dict) -> None:
+        """Fold one analyze_workout result into the aggregates"""
+        if "error" in analysis:
+            return
+        day = _as_date(day)
+        total_load = analysis["total_load"]
+        self.acute.add(day, TOTAL, total_load)
+        self.chronic.add(day, TOTAL, total_load)
+
+        for exercise in analysis.get("exercise_breakdown", []):
+            name = exercise["name"].lower()
+            # an exercise's load is split evenly over the muscle groups it trains
+            muscles = self.muscles_for(name) or ("core",)
+            share = exercise["load_contribution"] / len(muscles)
+            for muscle in muscles:
+                self.acute.add(day, muscle, share)
+                self.chronic.add(day, muscle, share)
+            self.weekly_volume.add(day, name, exercise["volume"])
+            self.weekly_volume.add(day, TOTAL, exercise["volume"])
+
+    def add_workouts(self, items: Iterable[Tuple[DayLike, Dict]]) -> None:
+        for day, analysis in items:
+            self.add_workout(day, analysis)
+
+    @staticmethod
+    def _ratio(acute: float, chronic: float) -> Optional[float]:
+        weekly_chronic = chronic / (CHRONIC_DAYS / ACUTE_DAYS)
+        return round(acute / weekly_chronic, 2) if weekly_chronic > 0 else None
+
+    def summary(self, as_of: Optional[DayLike] = None) -> Dict:
+        """Current acute/chronic load, ACWR and weekly volume, as_of moves the windows up to that day first"""
+        if as_of is not None:
+            as_of = _as_date(as_of)
+            for window in (self.acute, self.chronic, self.weekly_volume):
+                window.advance(as_of)
+
+        acute = self.acute.get(TOTAL)
+        chronic = self.chronic.get(TOTAL)
+        ratio = self._ratio(acute, chronic)
+
+        muscles = sorted(key for key, value in self.chronic.totals.items() if key != TOTAL and value > 0)
+        return {
+            "as_of": self.chronic.end.isoformat() if self.chronic.end else None,
+            "acute_load_7d": round(acute, 1),
+            "chronic_load_28d": round(chronic, 1),
+            "acwr": ratio,
+            "acwr_zone": acwr_zone(ratio),
+            "muscle_groups": {
+                muscle: {
+                    "acute_load_7d": round(self.acute.get(muscle), 1),
+                    "chronic_load_28d": round(self.chronic.get(muscle), 1),
+                    "acwr": self._ratio(self.acute.get(muscle), self.chronic.get(muscle))
+                }
+                for muscle in muscles
+            },
+            "weekly_volume": {
+                name: round(value, 1)
+                for name, value in sorted(self.weekly_volume.totals.items())
+                if name != TOTAL and value > 0
+            },
+            "weekly_volume_total": round(self.weekly_volume.get(TOTAL), 1)
+        }
@@ -0,0 +1,172 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+"""
+Typed workout representation
+
+Workout / ExerciseEntry replace the legacy dict, where exercises sit under a dynamic workout_<timestamp> key
+next to time, muscles_targeted (comma joined) and date. WorkoutLog stores many workouts column by column in
+typed arrays, which is what large histories and analyze_workouts_batch want.
+
+Use Workout.from_legacy / to_legacy to convert at the edges, collect_workout_data still produces the legacy dict.
+"""
+
+
+@dataclass(slots=True)
+class ExerciseEntry:
+    name: str
+    sets: int
+    reps: int
+    weight: float
+    rpe: int
+
+    @property
+    def volume(self) -> float:
+        return self.sets * self.reps * self.weight
+
+
+@dataclass(slots=True)
+class Workout:
+    workout_id: str
+    exercises: List[ExerciseEntry] = field(default_factory=list)
+    time: int = 1  # minutes
+    muscles_targeted: Tuple[str, ...] = ()
+    date: Optional[str] = None  # YYYY-MM-DD
+
+    @classmethod
+    def from_legacy(cls, data: Dict) -> "Workout":
+        workout_id = ""
+        exercises = []
+        for key, value in data.items():
+            if isinstance(value, dict):
+                workout_id = workout_id or key
+                for name, exercise_data in value.items():
+                    if isinstance(exercise_data, tuple) and len(exercise_data) == 4:
+                        sets, reps, weight, rpe = exercise_data
+                        exercises.append(ExerciseEntry(name, sets, reps, weight, rpe))
+
+        muscles = data.get("muscles_targeted", "")
+        return cls(
+            workout_id=workout_id,
+            exercises=exercises,
+            time=data.get("time", 1),
+            muscles_targeted=tuple(muscles.split(", ")) if muscles else (),
+            date=data.get("date")
+        )
+
+    def to_legacy(self) -> Dict:
+        return {
+            self.workout_id: {e.name: (e.sets, e.reps, e.weight, e.rpe) for e in self.exercises},
+            "time": self.time,
+            "muscles_targeted": ", ".join(self.muscles_targeted),
+            "date": self.date,
+            "exercise_count": len(self.exercises)
+        }
+
+
+class WorkoutLog:
+    """
+    Many workouts in columnar form: one typed array per field instead of one object per exercise
+    Exercise names and muscle group tuples are interned, so repeated names cost 4 bytes per entry
+    """
+
+    def __init__(self, workouts: Iterable[Workout] = ()):
+        # per exercise entry, "i" is a 4 byte int on every platform
+        self.workout_index = array("i")
+        self.name_ids = array("i")
+        self.sets = array("i")
+        self.reps = array("i")
+        self.weight = array("d")
+        self.rpe = array("i")
+
+        # per workout, offsets[i]:offsets[i + 1] are the entries of workout i
+        self.offsets = array("q", [0])
+        self.workout_ids: List[str] = []
+        self.times = array("i")
+        self.muscle_ids = array("i")
+        self.dates: List[Optional[str]] = []
+
+        # interning tables
+        self.names: List[str] = []
+        self._name_lookup: Dict[str, int] = {}
+        self.muscle_groups: List[Tuple[str, ...]] = []
+        self._muscle_lookup: Dict[Tuple[str, ...], int] = {}
+
+        self.extend(workouts)
+
+    @classmethod
+    def from_legacy(cls, workouts: Iterable[Dict]) -> "WorkoutLog":
+        return cls(Workout.from_legacy(w) for w in workouts)
+
+    def _intern(self, value, table: list, lookup: dict) -> int:
+        idx = lookup.get(value)
+        if idx is None:
+            idx = lookup[value] = len(table)
+            table.append(value)
+        return idx
+
+    def append(self, workout: Workout) -> None:
+        i = len(self.workout_ids)
+        for e in workout.exercises:
+            self.workout_index.append(i)
+            self.name_ids.append(self._intern(e.name, self.names, self._name_lookup))
+            self.sets.append(e.sets)
+            self.reps.append(e.reps)
+            self.weight.append(e.weight)
+            self.rpe.append(e.rpe)
+
+        self.offsets.append(len(self.name_ids))
+        self.workout_ids.append(workout.workout_id)
+        self.times.append(workout.time)
+        self.muscle_ids.append(self._intern(tuple(workout.muscles_targeted), self.muscle_groups,
+                                            self._muscle_lookup))
+        self.dates.append(workout.date)
+
+    def extend(self, workouts: Iterable[Workout]) -> None:
+        for workout in workouts:
+            self.append(workout)
+
+    def __len__(self) -> int:
+        return len(self.workout_ids)
+
+    @property
+    def entry_count(self) -> int:
+        return len(self.name_ids)
+
+    def __getitem__(self, i: int) -> Workout:
+        if i < 0:
+            i += len(self)
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return Workout(
+            workout_id=self.workout_ids[i],
+            exercises=[ExerciseEntry(self.names[self.name_ids[j]], self.sets[j], self.reps[j], self.weight[j],
+                                     self.rpe[j])
+                       for j in range(start, end)],
+            time=self.times[i],
+            muscles_targeted=self.muscle_groups[self.muscle_ids[i]],
+            date=self.dates[i]
+        )
+
+    def __iter__(self) -> Iterator[Workout]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_legacy(self) -> List[Dict]:
+        return [workout.to_legacy() for workout in self]
+
+    def columns(self) -> Dict[str, "np.ndarray"]:
+        """Zero-copy numpy views of the per-entry columns"""
+        import numpy as np  # only needed for batch analysis, not for storing workouts
+
+        return {
+            "workout_idx": np.frombuffer(self.workout_index, dtype=np.int32),
+            "name_ids": np.frombuffer(self.name_ids, dtype=np.int32),
+            "sets": np.frombuffer(self.sets, dtype=np.int32),
+            "reps": np.frombuffer(self.reps, dtype=np.int32),
+            "weight": np.frombuffer(self.weight, dtype=np.float64),
+            "rpe": np.frombuffer(self.rpe, dtype=np.int32),
+        }
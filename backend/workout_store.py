@@ -0,0 +1,173 @@
+import datetime
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from workout_model import ExerciseEntry, Workout, WorkoutLog
+
+"""
+Local workout history in sqlite
+
+One row per workout plus one row per exercise. WAL mode lets readers (charts, analysis) run while a workout
+is being written, and every write goes through a single transaction. Dates are stored as YYYY-MM-DD text so
+range queries are plain index range scans on (date) and (exercise, date).
+"""
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS workouts (
+        id INTEGER PRIMARY KEY,
+        workout_key TEXT NOT NULL,
+        date TEXT NOT NULL,
+        time INTEGER NOT NULL,
+        muscles_targeted TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS workouts_date_idx ON workouts (date)",
+    # date is copied onto each exercise so one exercise's history is a single index range
+    """
+    CREATE TABLE IF NOT EXISTS exercises (
+        workout_id INTEGER NOT NULL REFERENCES workouts (id),
+        position INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        exercise TEXT NOT NULL,
+        sets INTEGER NOT NULL,
+        reps INTEGER NOT NULL,
+        weight REAL NOT NULL,
+        rpe INTEGER NOT NULL,
+        PRIMARY KEY (workout_id, position)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS exercises_exercise_date_idx ON exercises (exercise, date)",
+    # data_version goes up with every write, derived data (charts) is cached against it
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)",
+]
+
+INSERT_WORKOUT_SQL = "INSERT INTO workouts (workout_key, date, time, muscles_targeted) VALUES (?, ?, ?, ?)"
+INSERT_EXERCISE_SQL = """
+    INSERT INTO exercises (workout_id, position, date, exercise, sets, reps, weight, rpe)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+BUMP_VERSION_SQL = "UPDATE meta SET value = value + 1 WHERE key = 'data_version'"
+SELECT_VERSION_SQL = "SELECT value FROM meta WHERE key = 'data_version'"
+SELECT_RANGE_SQL = """
+    SELECT w.id, w.workout_key, w.date, w.time, w.muscles_targeted,
+           e.exercise, e.sets, e.reps, e.weight, e.rpe
+    FROM workouts w LEFT JOIN exercises e ON e.workout_id = w.id
+    WHERE w.date BETWEEN ? AND ?
+    ORDER BY w.date, w.id, e.position
+"""
+SELECT_EXERCISE_SQL = """
+    SELECT date, sets, reps, weight, rpe FROM exercises
+    WHERE exercise = ? AND date BETWEEN ? AND ?
+    ORDER BY date, workout_id
+"""
+
+DateLike = Union[str, datetime.date]
+
+# open ends of a date range, compare below / above every YYYY-MM-DD string
+FIRST_DAY = "0000-00-00"
+LAST_DAY = "9999-99-99"
+
+
+def as_day(value: Optional[DateLike], default: str) -> str:
+    """YYYY-MM-DD string for a date or date string, default when value is None"""
+    if value is None:
+        return default
+    if isinstance(value, datetime.date):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+class WorkoutStore:
+    def __init__(self, path: str = "workout_history.db"):
+        self.path = path
+        # cached_statements keeps the prepared INSERT/SELECT statements around between calls
+        self._conn = sqlite3.connect(path, check_same_thread=False, cached_statements=64)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+
+    def add_workout(self, workout: Union[Dict, Workout]) -> int:
+        """Store one workout (legacy dict or Workout), returns its id"""
+        return self.add_workouts([workout])[0]
+
+    def add_workouts(self, workouts: Iterable[Union[Dict, Workout]]) -> List[int]:
+        """Store many workouts in a single transaction"""
+        ids = []
+        with self._lock, self._conn:
+            for workout in workouts:
+                if not isinstance(workout, Workout):
+                    workout = Workout.from_legacy(workout)
+                day = as_day(workout.date, datetime.date.today().strftime("%Y-%m-%d"))
+                cursor = self._conn.execute(INSERT_WORKOUT_SQL, (workout.workout_id, day, workout.time,
+                                                                 ", ".join(workout.muscles_targeted)))
+                workout_id = cursor.lastrowid
+                self._conn.executemany(INSERT_EXERCISE_SQL, [
+                    (workout_id, position, day, e.name, e.sets, e.reps, e.weight, e.rpe)
+                    for position, e in enumerate(workout.exercises)
+                ])
+                ids.append(workout_id)
+            if ids:
+                self._conn.execute(BUMP_VERSION_SQL)
+        return ids
+
+    def data_version(self) -> int:
+        """Counter that changes whenever workouts are added (by any connection to the file)"""
+        with self._lock:
+            return self._conn.execute(SELECT_VERSION_SQL).fetchone()[0]
+
+    def _range_rows(self, start: Optional[DateLike], end: Optional[DateLike]) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(SELECT_RANGE_SQL, (as_day(start, FIRST_DAY), as_day(end, LAST_DAY))).fetchall()
+
+    def workouts_between(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> List[Workout]:
+        """Workouts with start <= date <= end (inclusive, either end open when None), oldest first"""
+        workouts: List[Workout] = []
+        last_id = None
+        for row in self._range_rows(start, end):
+            if row[0] != last_id:
+                last_id = row[0]
+                workouts.append(Workout(
+                    workout_id=row[1],
+                    date=row[2],
+                    time=row[3],
+                    muscles_targeted=tuple(row[4].split(", ")) if row[4] else ()
+                ))
+            if row[5] is not None:
+                workouts[-1].exercises.append(ExerciseEntry(row[5], row[6], row[7], row[8], row[9]))
+        return workouts
+
+    def legacy_workouts_between(self, start: Optional[DateLike] = None,
+                                end: Optional[DateLike] = None) -> List[Dict]:
+        return [workout.to_legacy() for workout in self.workouts_between(start, end)]
+
+    def workout_log_between(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> WorkoutLog:
+        return WorkoutLog(self.workouts_between(start, end))
+
+    def exercise_history(self, exercise: str, start: Optional[DateLike] = None,
+                         end: Optional[DateLike] = None) -> List[Tuple[str, int, int, float, int]]:
+        """(date, sets, reps, weight, rpe) for one exercise, oldest first"""
+        with self._lock:
+            return self._conn.execute(SELECT_EXERCISE_SQL, (exercise, as_day(start, FIRST_DAY),
+                                                            as_day(end, LAST_DAY))).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# shared store for the chat app, WORKOUT_DB_PATH picks the file
+_workout_store: Optional[WorkoutStore] = None
+
+
+def get_workout_store() -> WorkoutStore:
+    global _workout_store
+
+    if _workout_store is None:
+        _workout_store = WorkoutStore(os.getenv("WORKOUT_DB_PATH", "workout_history.db"))
+    return _workout_store